@@ -23,23 +23,34 @@ Actions in mixed mode:
     mem_limit          Reduce memory limit via docker update.
     cpu_hog            Busy loop inside container for short duration.
     memory_hog         Allocate memory inside container then release.
+
+cpu_hog, memory_hog, disk_fill and metrics_block are handed to a long-lived
+chaos_worker.py started once inside each target; when it cannot be started
+(or has died, e.g. after a restart) a one-off `docker exec` payload is used.
+
+The agent uses only the standard library (it runs on the backend image's bare
+python3): snapshot I/O fans out over a small fixed thread pool, HTTP goes
+through keep-alive `http.client` connections and docker calls through the
+Engine API socket.
 """
 
 from __future__ import annotations
+import atexit
+import math
 import os
 import random
 import time
 import json
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from typing import List, Dict, Callable, Any
 import argparse
 import pathlib
-import urllib.request
-import urllib.error
 import urllib.parse
 import re
 import http.client
-import socket
+import threading
+import types
 
 import sys as _sys
 import pathlib as _pl
@@ -55,6 +66,8 @@ try:
         unpause_container,
         restart_container,
         kill_container,
+        DockerAPI,
+        DOCKER_SOCK,
     )
 except ImportError:
     # Fallback for original structure
@@ -64,11 +77,39 @@ except ImportError:
         unpause_container,
         restart_container,
         kill_container,
+        DockerAPI,
+        DOCKER_SOCK,
     )
 
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
 DOCKER_CMD = os.environ.get("DOCKER_CMD", "docker")
 
 
+def _dumps(obj: Any) -> bytes:
+    """Compact JSON as bytes; orjson when installed, stdlib json otherwise."""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+# Service port and Prometheus instance label per test_app container.
+_TARGET_PORTS = types.MappingProxyType({
+    "testapp_gateway": 5000,
+    "testapp_catalog": 5001,
+    "testapp_cart": 5002,
+    "testapp_payment": 5003,
+})
+_TARGET_INSTANCES = types.MappingProxyType({
+    "testapp_gateway": "gateway:5000",
+    "testapp_catalog": "catalog:5001",
+    "testapp_cart": "cart:5002",
+    "testapp_payment": "payment:5003",
+})
+
 MONITORING_EXCLUDES = {
     "testapp_prometheus",
     "testapp_grafana",
@@ -81,46 +122,119 @@ MONITORING_EXCLUDES = {
     "otel-collector",
 }
 MONITORING_PREFIXES = {"prometheus", "grafana", "otel", "loki", "tempo", "zipkin", "jaeger"}
+_MON_PREFIXES = tuple(MONITORING_PREFIXES)
 
 
 def is_monitoring_container(name: str) -> bool:
-    n = (name or "").lower()
-    if n in MONITORING_EXCLUDES:
-        return True
-    return any(n.startswith(p) for p in MONITORING_PREFIXES)
+    n = name.lower() if name else ""
+    return n in MONITORING_EXCLUDES or n.startswith(_MON_PREFIXES)
+
+
+class _ContainerCache:
+    """Container name sets built from one `docker ps -a` call and reused for a short TTL.
+
+    `check` also remembers per-name verdicts: a few seconds for found targets and
+    longer for missing ones, so a stale `--targets` entry is not rescanned on
+    every iteration.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.all: set[str] = set()
+        self.running: set[str] = set()
+        self.ts: float | None = None
+        self.maxsize = maxsize
+        self._checked: Dict[str, tuple[float, tuple[bool, str | None]]] = {}
+
+    def refresh(self, ttl: float = 2.0) -> None:
+        now = time.monotonic()
+        if self.ts is not None and now - self.ts < ttl:
+            return
+        all_names: set[str] = set()
+        running: set[str] = set()
+        for c in list_containers(all=True).get("containers", []):
+            n = c.get("Names")
+            if not n:
+                continue
+            all_names.add(n)
+            # `docker ps` without -a lists running and paused containers
+            state = c.get("State")
+            if state in ("running", "paused") or (state is None and str(c.get("Status", "")).startswith("Up")):
+                running.add(n)
+        self.all, self.running, self.ts = all_names, running, now
+
+    def check(self, name: str, ttl: float = 2.0, miss_ttl: float = 30.0) -> tuple[bool, str | None]:
+        now = time.monotonic()
+        hit = self._checked.get(name)
+        if hit is not None and now < hit[0]:
+            return hit[1]
+        if is_monitoring_container(name):
+            verdict: tuple[bool, str | None] = (False, "target excluded (monitoring container)")
+            expires = math.inf
+        else:
+            self.refresh(ttl)
+            if name not in self.all:
+                verdict, expires = (False, "target not found"), now + miss_ttl
+            elif name not in self.running:
+                verdict, expires = (False, "target not running"), now + ttl
+            else:
+                verdict, expires = (True, None), now + ttl
+        self._checked.pop(name, None)
+        if len(self._checked) >= self.maxsize:
+            self._checked.pop(next(iter(self._checked)))
+        self._checked[name] = (expires, verdict)
+        return verdict
+
+    def invalidate(self) -> None:
+        self.ts = None
+        self._checked.clear()
+
+
+_CONTAINERS = _ContainerCache()
 
 
 def is_running_container(name: str) -> bool:
-    data = list_containers(all=False)
-    for c in data.get("containers", []):
-        if c.get("Names") == name:
-            return True
-    return False
+    _CONTAINERS.refresh()
+    return name in _CONTAINERS.running
 
 
 def container_exists(name: str) -> bool:
-    data = list_containers(all=True)
-    for c in data.get("containers", []):
-        if c.get("Names") == name:
-            return True
-    return False
+    _CONTAINERS.refresh()
+    return name in _CONTAINERS.all
 
 
 class Monitor:
     def __init__(self, log_path: pathlib.Path) -> None:
         self.log_path = log_path
+        # opened once for the whole run; main() flushes once per iteration
+        self._fh = None
+        try:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = log_path.open("ab", buffering=1 << 16)
+            atexit.register(self._fh.close)
+        except OSError:
+            pass
+
+    def log(self, event: Dict[str, Any]) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._fh.write(_dumps(event) + b"\n")
+        except Exception:
+            pass
+
+    def flush(self) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._fh.flush()
+        except OSError:
+            pass
 
     def check_target(self, name: str) -> tuple[bool, str | None]:
-        if is_monitoring_container(name):
-            return False, "target excluded (monitoring container)"
-        if not container_exists(name):
-            return False, "target not found"
-        if not is_running_container(name):
-            return False, "target not running"
-        return True, None
+        return _CONTAINERS.check(name)
 
     def log_violation(self, action: str, target: str, reason: str) -> None:
-        write_log_line(self.log_path, {
+        self.log({
             "ts": time.time(),
             "action": action,
             "target": target,
@@ -154,31 +268,142 @@ def _run(cmd: List[str], timeout: int = 30) -> Dict[str, Any]:
         return {"cmd": " ".join(cmd), "stdout": "", "stderr": "", "rc": -1, "error": str(e)}
 
 
+_DOCKER = DockerAPI(DOCKER_SOCK)
+
+
+_SIZE_RE = re.compile(r"([0-9]*\.?[0-9]+)\s*([KMGTP]?i?B)", re.I)
+_SIZE_MULT = {
+    "B": 1,
+    "KB": 1000,
+    "KIB": 1024,
+    "MB": 1000**2,
+    "MIB": 1024**2,
+    "GB": 1000**3,
+    "GIB": 1024**3,
+    "TB": 1000**4,
+    "TIB": 1024**4,
+}
+
+
 def _parse_size_to_bytes(size_str: str) -> float | None:
     try:
         s = size_str.strip()
-        m = re.match(r"([0-9]*\.?[0-9]+)\s*([KMGTP]?i?B)", s, re.I)
+        m = _SIZE_RE.match(s)
         if not m:
             return None
         val = float(m.group(1))
         unit = m.group(2).upper()
-        mult = {
-            "B": 1,
-            "KB": 1000,
-            "KIB": 1024,
-            "MB": 1000**2,
-            "MIB": 1024**2,
-            "GB": 1000**3,
-            "GIB": 1024**3,
-            "TB": 1000**4,
-            "TIB": 1024**4,
-        }.get(unit, 1)
+        mult = _SIZE_MULT.get(unit, 1)
         return val * mult
     except Exception:
         return None
 
 
+class _CgroupReader:
+    """Read container CPU/memory usage straight from cgroup files.
+
+    `docker stats --no-stream` samples CPU twice with a ~1s sleep in between and
+    forks a client per call. Here the container id is resolved once, the cgroup
+    files are read directly and CPU% is computed against the previous sample.
+    """
+
+    def __init__(self, root: str = "/sys/fs/cgroup") -> None:
+        self.root = pathlib.Path(root)
+        self._ids: Dict[str, str] = {}
+        self._prev: Dict[str, tuple[int, float]] = {}
+        # None until a container's cgroup dir is first found (True) or a resolved id has
+        # none (False: this root is not the host's, e.g. the agent runs in a container)
+        self._usable: bool | None = None
+
+    def _container_id(self, name: str) -> str | None:
+        cid = self._ids.get(name)
+        if cid is None:
+            res = _run([DOCKER_CMD, "inspect", "--format", "{{.Id}}", name])
+            if res.get("error") or not res.get("stdout"):
+                return None
+            cid = res["stdout"].strip()
+            self._ids[name] = cid
+        return cid
+
+    def _cgroup_dir(self, cid: str) -> pathlib.Path | None:
+        for d in (
+            self.root / "system.slice" / f"docker-{cid}.scope",  # cgroup v2, systemd driver
+            self.root / "docker" / cid,  # cgroupfs driver
+        ):
+            if (d / "cpu.stat").is_file():
+                return d
+        return None
+
+    @staticmethod
+    def _read_kv(path: pathlib.Path) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        with open(path) as f:
+            for line in f.read().splitlines():
+                key, _, val = line.partition(" ")
+                if val.isdigit():
+                    out[key] = int(val)
+        return out
+
+    def read(self, name: str) -> Dict[str, Any] | None:
+        """Return a `docker_stats_once`-shaped dict, or None if cgroup files are not accessible."""
+        if self._usable is False or not self.root.is_dir():
+            return None
+        cid = self._container_id(name)
+        if not cid:
+            return None
+        d = self._cgroup_dir(cid)
+        if d is None:
+            if self._usable is None:
+                # no container has ever been found here: skip straight to `docker stats`
+                # from now on instead of paying an inspect per sample as well
+                self._usable = False
+            else:
+                # container may have been recreated under a new id; resolve again next time
+                self._ids.pop(name, None)
+            return None
+        self._usable = True
+        try:
+            now = time.monotonic()
+            usage_usec = self._read_kv(d / "cpu.stat")["usage_usec"]
+            with open(d / "memory.current") as f:
+                mem_current = int(f.read())
+            with open(d / "memory.max") as f:
+                raw_max = f.read().strip()
+            inactive = self._read_kv(d / "memory.stat").get("inactive_file", 0)
+        except (OSError, KeyError, ValueError):
+            return None
+        if raw_max == "max":
+            mem_limit = float(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"))
+        else:
+            mem_limit = float(raw_max)
+        # same "used" figure the docker CLI reports: usage minus reclaimable page cache
+        mem_used = float(max(0, mem_current - inactive))
+
+        cpu_pct = None
+        prev = self._prev.get(name)
+        self._prev[name] = (usage_usec, now)
+        if prev is not None and now > prev[1]:
+            wall_usec = (now - prev[1]) * 1_000_000
+            # 100% == one full core, matching `docker stats`
+            cpu_pct = round((usage_usec - prev[0]) / wall_usec * 100.0, 2)
+        return {
+            "cpu_pct": cpu_pct,
+            "mem_used_bytes": mem_used,
+            "mem_limit_bytes": mem_limit,
+            "mem_pct": round(mem_used / mem_limit * 100.0, 2) if mem_limit else None,
+            "net_io": None,
+            "block_io": None,
+        }
+
+
+_CGROUP = _CgroupReader()
+
+
 def docker_stats_once(name: str) -> Dict[str, Any]:
+    stats = _CGROUP.read(name)
+    if stats is not None:
+        return stats
+    # cgroup files not reachable (e.g. Docker Desktop VM): fall back to the CLI
     fmt = "{{.CPUPerc}}|{{.MemUsage}}|{{.MemPerc}}|{{.NetIO}}|{{.BlockIO}}"
     res = _run([DOCKER_CMD, "stats", name, "--no-stream", "--format", fmt])
     if res.get("error") or not res.get("stdout"):
@@ -203,6 +428,9 @@ def docker_stats_once(name: str) -> Dict[str, Any]:
 
 
 def docker_exec(name: str, exec_cmd: List[str], detach: bool = True, timeout: int = 30) -> Dict[str, Any]:
+    res = _DOCKER.exec(name, exec_cmd, detach=detach, timeout=timeout)
+    if res is not None:
+        return res
     args = [DOCKER_CMD, "exec"]
     if detach:
         args.append("-d")
@@ -213,22 +441,106 @@ def docker_exec(name: str, exec_cmd: List[str], detach: bool = True, timeout: in
 
 def update_resources(name: str, cpu_percent: int | None = None, mem_limit_mb: int | None = None) -> Dict[str, Any]:
     args = [DOCKER_CMD, "update"]
+    body: Dict[str, Any] = {}
     if cpu_percent is not None:
         period = 100_000
         quota = max(1, int(period * cpu_percent / 100))
         args += ["--cpu-period", str(period), "--cpu-quota", str(quota)]
+        body.update(CpuPeriod=period, CpuQuota=quota)
     if mem_limit_mb is not None:
         args += ["--memory", f"{mem_limit_mb}m"]
+        body["Memory"] = mem_limit_mb * 1024 * 1024
     args.append(name)
+    res = _DOCKER.update(name, body)
+    if res is not None:
+        return res
     return _run(args)
 
 
+WORKER_SRC = pathlib.Path(__file__).with_name("chaos_worker.py")
+WORKER_PATH = "/tmp/chaos_worker.py"
+WORKER_FIFO = "/tmp/chaos_worker.fifo"
+WORKER_PID = "/tmp/chaos_worker.pid"
+WORKER_STATUS = "/tmp/chaos_worker.status"
+WORKER_FAULTS = {"cpu_hog", "memory_hog", "disk_fill", "metrics_block"}
+# worker op name -> fault it implements, for failures drained from the status file
+WORKER_OP_FAULTS = {"cpu": "cpu_hog", "mem": "memory_hog", "disk": "disk_fill", "iptables_drop": "metrics_block"}
+_WORKERS: set[str] = set()
+# /tmp survives `docker restart`, so a pid file alone does not prove the worker is alive:
+# the old pid is often reused by the app. The command line has to be the worker's.
+_WORKER_ALIVE = f'pid="$(cat {WORKER_PID} 2>/dev/null)" && [ -n "$pid" ] && grep -qs chaos_worker.py "/proc/$pid/cmdline"'
+
+
+def start_worker(name: str) -> bool:
+    """Copy chaos_worker.py into the container and start it once; later faults reuse it."""
+    if name in _WORKERS:
+        return True
+    if not WORKER_SRC.is_file():
+        return False
+    cp = _run([DOCKER_CMD, "cp", str(WORKER_SRC), f"{name}:{WORKER_PATH}"])
+    if cp.get("error"):
+        return False
+    # clear what a worker from before a restart left behind, so the new one neither
+    # trusts the stale pid nor inherits its status lines
+    docker_exec(name, ["sh", "-c", f"{_WORKER_ALIVE} || rm -f {WORKER_PID} {WORKER_FIFO} {WORKER_STATUS}"], detach=False)
+    started = docker_exec(name, ["python", WORKER_PATH], detach=True)
+    if started.get("error"):
+        return False
+    _WORKERS.add(name)
+    return True
+
+
+def send_to_worker(name: str, msg: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Hand a command to the container's worker; None means no live worker (caller falls back).
+
+    The op itself is fire-and-forget, so the result is marked ``confirmed: False``.
+    Failures the worker logged for earlier ops are drained from its status file
+    and returned as ``worker_failures``; main() counts them as errors for this target.
+    """
+    if name not in _WORKERS:
+        return None
+    # the write is bounded: with no reader on the FIFO an open() for writing blocks forever
+    script = (
+        f'[ -p {WORKER_FIFO} ] && {_WORKER_ALIVE} '
+        f"&& timeout 2 sh -c 'printf \"%s\\n\" \"$1\" > {WORKER_FIFO}' chaos \"$1\" "
+        f'&& {{ cat {WORKER_STATUS} 2>/dev/null; rm -f {WORKER_STATUS}; true; }}'
+    )
+    res = docker_exec(name, ["sh", "-c", script, "chaos", json.dumps(msg)], detach=False, timeout=10)
+    if res.get("error"):
+        # worker is gone (container restarted/killed); it is started again on the next refresh
+        _WORKERS.discard(name)
+        return None
+    failures = []
+    for line in (res.get("stdout") or "").splitlines():
+        try:
+            failures.append(json.loads(line))
+        except ValueError:
+            continue
+    return {**res, "confirmed": False, "worker_failures": failures}
+
+
+def worker_failures(result: Any) -> List[Dict[str, Any]]:
+    """Failures drained by send_to_worker, whether the fault returned its result bare or under "worker"."""
+    if not isinstance(result, dict):
+        return []
+    sent = result.get("worker") if isinstance(result.get("worker"), dict) else result
+    return list(sent.get("worker_failures") or [])
+
+
 def burn_cpu_in_container(name: str, seconds: int = 30) -> Dict[str, Any]:
-    py = f"import time,math; t=time.time()+{seconds}; x=0\nwhile time.time()<t: x+=math.sqrt(123456)"
-    return docker_exec(name, ["python", "-c", py])
+    sent = send_to_worker(name, {"op": "cpu", "secs": seconds})
+    if sent is not None:
+        return sent
+    # a shell busy loop needs no interpreter start-up or compile inside the target
+    return docker_exec(name, ["sh", "-c", f"timeout {int(seconds)} sh -c 'while :; do :; done'"])
 
 
 def burn_mem_in_container(name: str, mb: int = 128, seconds: int = 30) -> Dict[str, Any]:
+    sent = send_to_worker(name, {"op": "mem", "mb": mb, "secs": seconds})
+    if sent is not None:
+        return sent
+    # stays python: sh has no way to pin N MB of anonymous memory (a pipe buffers only
+    # 64 KiB and /dev/shm is capped at 64 MB in a default container)
     py = (
         "import time; "
         f"a=[bytearray(1024*1024) for _ in range({mb})]; "
@@ -247,13 +559,13 @@ def pause_unpause(name: str) -> Dict[str, Any]:
 def kill_restart(name: str) -> Dict[str, Any]:
     k = kill_container(name)
     time.sleep(random.choice([5, 10]))
-    s = _run([DOCKER_CMD, "start", name])
+    s = _DOCKER.start(name) or _run([DOCKER_CMD, "start", name])
     return {"kill": k, "start": s}
 
 
 def pick_targets(configured: List[str]) -> List[str]:
-    data = list_containers(all=False)
-    names = {c.get("Names") for c in data.get("containers", []) if c.get("Names")}
+    _CONTAINERS.refresh()
+    names = _CONTAINERS.running
     if configured:
         base = [n for n in configured if n in names]
     else:
@@ -263,7 +575,7 @@ def pick_targets(configured: List[str]) -> List[str]:
 
 def log_event(event: Dict[str, Any], json_mode: bool) -> None:
     if json_mode:
-        print(json.dumps(event))
+        print(_dumps(event).decode("utf-8"))
     else:
         action = event.get("action")
         target = event.get("target")
@@ -271,85 +583,114 @@ def log_event(event: Dict[str, Any], json_mode: bool) -> None:
         print(f"[CHAOS] action={action} target={target} status={status}")
 
 
+class _RS:
+    """Running count/sum/sum-of-squares; O(1) memory per series."""
+
+    __slots__ = ("n", "s", "q")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.s = 0.0
+        self.q = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        self.s += x
+        self.q += x * x
+
+    def mean(self) -> float | None:
+        return self.s / self.n if self.n else None
+
+    def std(self) -> float | None:
+        if not self.n:
+            return None
+        m = self.s / self.n
+        return math.sqrt(max(0.0, self.q / self.n - m * m))
+
+
+def _delta_pct(before: float | None, after: float | None) -> float | None:
+    if before is not None and after is not None and before != 0:
+        return round((after - before) / before * 100.0, 2)
+    return None
+
+
 class Stats:
     def __init__(self) -> None:
         self.total = 0
         self.errors = 0
         self.by_action: Dict[str, int] = {}
         self.by_target: Dict[str, int] = {}
-        self.lat_before: List[float] = []
-        self.lat_after: List[float] = []
+        self.errors_by_action: Dict[str, int] = {}
+        self.errors_by_target: Dict[str, int] = {}
+        self.lat_before = _RS()
+        self.lat_after = _RS()
         self.fail_before = 0
         self.fail_after = 0
-        self.prom_series: Dict[str, Dict[str, List[float]]] = {}
-        self.up_before_vals: List[float] = []
-        self.up_after_vals: List[float] = []
+        self.prom_series: Dict[str, Dict[str, _RS]] = {}
+        self.up_before_vals = _RS()
+        self.up_after_vals = _RS()
         self.up_missing_before = 0
         self.up_missing_after = 0
-        self.docker_cpu_before: List[float] = []
-        self.docker_cpu_after: List[float] = []
-        self.docker_mem_before: List[float] = []
-        self.docker_mem_after: List[float] = []
+        self.docker_cpu_before = _RS()
+        self.docker_cpu_after = _RS()
+        self.docker_mem_before = _RS()
+        self.docker_mem_after = _RS()
 
     def add(self, action: str, target: str, ok: bool) -> None:
         self.total += 1
         if not ok:
-            self.errors += 1
+            self.add_failure(action, target)
         self.by_action[action] = self.by_action.get(action, 0) + 1
         self.by_target[target] = self.by_target.get(target, 0) + 1
 
+    def add_failure(self, action: str, target: str) -> None:
+        """Count an error against an action already in `total` (a worker op reported late)."""
+        self.errors += 1
+        self.errors_by_action[action] = self.errors_by_action.get(action, 0) + 1
+        self.errors_by_target[target] = self.errors_by_target.get(target, 0) + 1
+
     def add_probe(self, before_ms: float | None, after_ms: float | None) -> None:
         if before_ms is None:
             self.fail_before += 1
         else:
-            self.lat_before.append(before_ms)
+            self.lat_before.add(before_ms)
         if after_ms is None:
             self.fail_after += 1
         else:
-            self.lat_after.append(after_ms)
+            self.lat_after.add(after_ms)
 
     def summary(self) -> Dict[str, Any]:
-        avg_before = sum(self.lat_before)/len(self.lat_before) if self.lat_before else None
-        avg_after = sum(self.lat_after)/len(self.lat_after) if self.lat_after else None
+        avg_before = self.lat_before.mean()
+        avg_after = self.lat_after.mean()
         pct_errors = (self.errors / self.total * 100) if self.total else 0.0
         prom_summary: Dict[str, Any] = {}
         for alias, series in self.prom_series.items():
-            b = series.get("before", [])
-            a = series.get("after", [])
-            b_avg = sum(b)/len(b) if b else None
-            a_avg = sum(a)/len(a) if a else None
-            delta = None
-            if b_avg is not None and a_avg is not None and b_avg != 0:
-                delta = round((a_avg - b_avg) / b_avg * 100.0, 2)
+            b_avg = series["before"].mean()
+            a_avg = series["after"].mean()
             prom_summary[alias] = {
                 "avg_before": round(b_avg, 6) if b_avg is not None else None,
                 "avg_after": round(a_avg, 6) if a_avg is not None else None,
-                "delta_pct": delta,
+                "delta_pct": _delta_pct(b_avg, a_avg),
             }
-        up_b = sum(self.up_before_vals)/len(self.up_before_vals) if self.up_before_vals else None
-        up_a = sum(self.up_after_vals)/len(self.up_after_vals) if self.up_after_vals else None
-        up_delta = None
-        if up_b is not None and up_a is not None and up_b != 0:
-            up_delta = round((up_a - up_b) / up_b * 100.0, 2)
-        cpu_b = sum(self.docker_cpu_before)/len(self.docker_cpu_before) if self.docker_cpu_before else None
-        cpu_a = sum(self.docker_cpu_after)/len(self.docker_cpu_after) if self.docker_cpu_after else None
-        cpu_delta = None
-        if cpu_b is not None and cpu_a is not None and cpu_b != 0:
-            cpu_delta = round((cpu_a - cpu_b) / cpu_b * 100.0, 2)
-        mem_b = sum(self.docker_mem_before)/len(self.docker_mem_before) if self.docker_mem_before else None
-        mem_a = sum(self.docker_mem_after)/len(self.docker_mem_after) if self.docker_mem_after else None
-        mem_delta = None
-        if mem_b is not None and mem_a is not None and mem_b != 0:
-            mem_delta = round((mem_a - mem_b) / mem_b * 100.0, 2)
+        up_b = self.up_before_vals.mean()
+        up_a = self.up_after_vals.mean()
+        cpu_b = self.docker_cpu_before.mean()
+        cpu_a = self.docker_cpu_after.mean()
+        mem_b = self.docker_mem_before.mean()
+        mem_a = self.docker_mem_after.mean()
         return {
             "total_actions": self.total,
             "errors": self.errors,
             "error_pct": round(pct_errors, 2),
             "by_action": self.by_action,
             "by_target": self.by_target,
+            "errors_by_action": self.errors_by_action,
+            "errors_by_target": self.errors_by_target,
             "probe": {
                 "avg_latency_ms_before": round(avg_before, 2) if avg_before is not None else None,
                 "avg_latency_ms_after": round(avg_after, 2) if avg_after is not None else None,
+                "std_latency_ms_before": round(self.lat_before.std(), 2) if self.lat_before.n else None,
+                "std_latency_ms_after": round(self.lat_after.std(), 2) if self.lat_after.n else None,
                 "failed_probes_before": self.fail_before,
                 "failed_probes_after": self.fail_after,
             },
@@ -357,7 +698,7 @@ class Stats:
             "uptime": {
                 "avg_before": round(up_b, 6) if up_b is not None else None,
                 "avg_after": round(up_a, 6) if up_a is not None else None,
-                "delta_pct": up_delta,
+                "delta_pct": _delta_pct(up_b, up_a),
                 "missing_before": self.up_missing_before,
                 "missing_after": self.up_missing_after,
             },
@@ -365,12 +706,12 @@ class Stats:
                 "cpu_pct": {
                     "avg_before": round(cpu_b, 3) if cpu_b is not None else None,
                     "avg_after": round(cpu_a, 3) if cpu_a is not None else None,
-                    "delta_pct": cpu_delta,
+                    "delta_pct": _delta_pct(cpu_b, cpu_a),
                 },
                 "mem_used_bytes": {
                     "avg_before": round(mem_b, 1) if mem_b is not None else None,
                     "avg_after": round(mem_a, 1) if mem_a is not None else None,
-                    "delta_pct": mem_delta,
+                    "delta_pct": _delta_pct(mem_b, mem_a),
                 },
             },
         }
@@ -383,36 +724,37 @@ class Stats:
             b = (metrics_before or {}).get(alias)
             a = (metrics_after or {}).get(alias)
             if alias not in self.prom_series:
-                self.prom_series[alias] = {"before": [], "after": []}
+                self.prom_series[alias] = {"before": _RS(), "after": _RS()}
             if isinstance(b, (int, float)):
-                self.prom_series[alias]["before"].append(float(b))
+                self.prom_series[alias]["before"].add(float(b))
             if isinstance(a, (int, float)):
-                self.prom_series[alias]["after"].append(float(a))
+                self.prom_series[alias]["after"].add(float(a))
 
     def add_uptime(self, up_before: float | None, up_after: float | None) -> None:
         if up_before is None:
             self.up_missing_before += 1
         else:
             try:
-                self.up_before_vals.append(float(up_before))
+                self.up_before_vals.add(float(up_before))
             except Exception:
                 self.up_missing_before += 1
         if up_after is None:
             self.up_missing_after += 1
         else:
             try:
-                self.up_after_vals.append(float(up_after))
+                self.up_after_vals.add(float(up_after))
             except Exception:
                 self.up_missing_after += 1
+
     def add_docker_stats(self, before: Dict[str, Any] | None, after: Dict[str, Any] | None) -> None:
         if before and isinstance(before.get("cpu_pct"), (int, float)):
-            self.docker_cpu_before.append(float(before["cpu_pct"]))
+            self.docker_cpu_before.add(float(before["cpu_pct"]))
         if after and isinstance(after.get("cpu_pct"), (int, float)):
-            self.docker_cpu_after.append(float(after["cpu_pct"]))
+            self.docker_cpu_after.add(float(after["cpu_pct"]))
         if before and isinstance(before.get("mem_used_bytes"), (int, float)):
-            self.docker_mem_before.append(float(before["mem_used_bytes"]))
+            self.docker_mem_before.add(float(before["mem_used_bytes"]))
         if after and isinstance(after.get("mem_used_bytes"), (int, float)):
-            self.docker_mem_after.append(float(after["mem_used_bytes"]))
+            self.docker_mem_after.add(float(after["mem_used_bytes"]))
 
 
 def write_log_line(path: pathlib.Path, event: Dict[str, Any]) -> None:
@@ -424,45 +766,89 @@ def write_log_line(path: pathlib.Path, event: Dict[str, Any]) -> None:
         pass
 
 
+class _HttpPool:
+    """Keep-alive HTTP/1.1 connections shared by Prometheus queries and probes.
+
+    `urllib.request.urlopen` opens (and tears down) a TCP connection per call.
+    Idle connections are kept per host here and handed to one thread at a time.
+    """
+
+    def __init__(self, maxsize: int = 16) -> None:
+        self.maxsize = maxsize
+        self._idle: Dict[tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, key: tuple[str, str, int], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            scheme, host, port = key
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            return cls(host, port, timeout=timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def get(self, url: str, timeout: float) -> tuple[int, bytes]:
+        u = urllib.parse.urlsplit(url)
+        key = (u.scheme, u.hostname or "localhost", u.port or (443 if u.scheme == "https" else 80))
+        path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused:
+                    # server dropped an idle keep-alive connection; retry on a fresh one
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return resp.status, body
+
+
+_HTTP = _HttpPool()
+
+
 def probe_target(name: str, timeout: int = 3) -> float | None:
-    port_map = {
-        "testapp_gateway": 5000,
-        "testapp_catalog": 5001,
-        "testapp_cart": 5002,
-        "testapp_payment": 5003,
-    }
-    port = port_map.get(name)
+    port = _TARGET_PORTS.get(name)
     if port is None:
         return None
     url = f"http://localhost:{port}/metrics"
-    start = time.time()
+    start = time.monotonic()
     try:
-        with urllib.request.urlopen(url, timeout=timeout) as resp:
-            if resp.status != 200:
-                return None
-    except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, socket.timeout, http.client.RemoteDisconnected, ConnectionError, ConnectionResetError, ConnectionRefusedError):
+        status, _ = _HTTP.get(url, timeout=timeout)
+    except (OSError, http.client.HTTPException):
+        return None
+    if status != 200:
         return None
-    return (time.time() - start) * 1000.0
+    return (time.monotonic() - start) * 1000.0
 
 
 def prom_instance_label(name: str) -> str | None:
-    instance_map = {
-        "testapp_gateway": "gateway:5000",
-        "testapp_catalog": "catalog:5001",
-        "testapp_cart": "cart:5002",
-        "testapp_payment": "payment:5003",
-    }
-    return instance_map.get(name)
+    return _TARGET_INSTANCES.get(name)
 
 
 def discover_instance_for_target(prom_url: str, job: str, target: str) -> str | None:
-    port_map = {
-        "testapp_gateway": 5000,
-        "testapp_catalog": 5001,
-        "testapp_cart": 5002,
-        "testapp_payment": 5003,
-    }
-    port = port_map.get(target)
+    port = _TARGET_PORTS.get(target)
     if port is None:
         return None
     try:
@@ -478,17 +864,36 @@ def discover_instance_for_target(prom_url: str, job: str, target: str) -> str |
     return None
 
 
+_INSTANCE_CACHE: Dict[tuple[str, str, str], str | None] = {}
+
+
+def resolve_instance(prom_url: str, job: str, target: str) -> str | None:
+    """Memoized discover_instance_for_target; main() clears the cache on every target refresh."""
+    key = (prom_url, job, target)
+    if key not in _INSTANCE_CACHE:
+        _INSTANCE_CACHE[key] = discover_instance_for_target(prom_url, job, target) or prom_instance_label(target)
+    return _INSTANCE_CACHE[key]
+
+
 def prom_query(prom_url: str, promql: str, timeout: int = 4) -> Dict[str, Any]:
     try:
         url = f"{prom_url.rstrip('/')}/api/v1/query?" + urllib.parse.urlencode({"query": promql})
-        with urllib.request.urlopen(url, timeout=timeout) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            return data
+        status, body = _HTTP.get(url, timeout=timeout)
+        if status != 200:
+            return {"error": f"HTTP Error {status}"}
+        return json.loads(body.decode("utf-8"))
     except Exception as e:
         return {"error": str(e)}
 
 
+_QCACHE: Dict[tuple[str, str], Dict[str, str]] = {}
+
+
 def get_prom_queries_for_target(target: str, instance: str) -> Dict[str, str]:
+    """Return the PromQL set for a target; built once per (target, instance) and shared, so do not mutate."""
+    cached = _QCACHE.get((target, instance))
+    if cached is not None:
+        return cached
     q: Dict[str, str] = {}
     q["cpu_seconds_per_s"] = f"sum(rate(process_cpu_seconds_total{{instance=\"{instance}\"}}[1m]))"
     q["rss_bytes"] = f"avg(process_resident_memory_bytes{{instance=\"{instance}\"}})"
@@ -505,58 +910,114 @@ def get_prom_queries_for_target(target: str, instance: str) -> Dict[str, str]:
             "histogram_quantile(0.9, sum by (le) (rate("
             f"payment_payment_amount_bucket{{instance=\"{instance}\"}}[5m])))"
         )
+    _QCACHE[(target, instance)] = q
     return q
 
 
-def eval_prom_queries(prom_url: str, queries: Dict[str, str]) -> Dict[str, float | None]:
-    out: Dict[str, float | None] = {}
-    for alias, ql in queries.items():
-        res = prom_query(prom_url, ql)
-        val: float | None = None
-        try:
-            if res.get("status") == "success":
-                r = res.get("data", {}).get("result", [])
-                if r:
-                    v = r[0].get("value", [None, None])[1]
-                    if v is not None:
-                        val = float(v)
-        except Exception:
-            val = None
-        out[alias] = val
+def _prom_value(res: Dict[str, Any]) -> float | None:
+    try:
+        if res.get("status") == "success":
+            r = res.get("data", {}).get("result", [])
+            if r:
+                v = r[0].get("value", [None, None])[1]
+                if v is not None:
+                    return float(v)
+    except Exception:
+        pass
+    return None
+
+
+_SNAPSHOT_QCACHE: Dict[tuple[str, str], str] = {}
+
+
+def snapshot_query(target: str, instance: str) -> str:
+    """One PromQL expression for `up` plus the target's query set, each series tagged with an `alias` label."""
+    cached = _SNAPSHOT_QCACHE.get((target, instance))
+    if cached is not None:
+        return cached
+    parts = {"up": f"up{{instance=\"{instance}\"}}", **get_prom_queries_for_target(target, instance)}
+    q = " or ".join(f"label_replace({ql}, \"alias\", \"{alias}\", \"\", \"\")" for alias, ql in parts.items())
+    _SNAPSHOT_QCACHE[(target, instance)] = q
+    return q
+
+
+def snapshot_prom(prom_url: str, instance: str, target: str) -> Dict[str, float | None]:
+    """Evaluate `up` and the target's queries in a single Prometheus request, keyed by alias."""
+    out: Dict[str, float | None] = {"up": None, **{alias: None for alias in get_prom_queries_for_target(target, instance)}}
+    res = prom_query(prom_url, snapshot_query(target, instance))
+    if res.get("status") != "success":
+        return out
+    for item in res.get("data", {}).get("result", []):
+        alias = item.get("metric", {}).get("alias")
+        if alias in out and out[alias] is None:
+            try:
+                out[alias] = float(item.get("value", [None, None])[1])
+            except (TypeError, ValueError):
+                pass
+    return out
+
+
+def eval_prom_queries(prom_url: str, queries: Dict[str, str], pool: ThreadPoolExecutor | None = None) -> Dict[str, float | None]:
+    out: Dict[str, float | None] = {alias: None for alias in queries}
+    if pool is None:
+        for alias, ql in queries.items():
+            out[alias] = _prom_value(prom_query(prom_url, ql))
+        return out
+    futures = {pool.submit(prom_query, prom_url, ql): alias for alias, ql in queries.items()}
+    for fut in as_completed(futures):
+        out[futures[fut]] = _prom_value(fut.result())
     return out
 
 
+def gather_snapshot(pool: ThreadPoolExecutor, prom_url: str, target: str, inst: str | None, do_probe: bool) -> Dict[str, Any]:
+    """Run the probe, docker stats and Prometheus queries for one target concurrently."""
+    probe_f = pool.submit(probe_target, target) if do_probe else None
+    docker_f = pool.submit(docker_stats_once, target)
+    prom_f = pool.submit(snapshot_prom, prom_url, inst, target) if inst else None
+    wait([f for f in (probe_f, docker_f, prom_f) if f is not None])
+    prom = dict(prom_f.result()) if prom_f is not None else None
+    return {
+        "probe_ms": probe_f.result() if probe_f is not None else None,
+        "docker": docker_f.result(),
+        "up": prom.pop("up") if prom is not None else None,
+        "prom": prom,
+    }
+
+
 def disk_fill(name: str) -> Dict[str, Any]:
     mb = random.choice([50, 75, 100, 150])
-    py = (
-        "import os; sz=%d; path='/tmp/chaos_bloat.dat'; f=open(path,'wb'); chunk=b'0'*1024*1024;" % mb
-        + "\nfor _ in range(sz): f.write(chunk); f.flush(); f.close();"
+    sent = send_to_worker(name, {"op": "disk", "mb": mb, "secs": 10})
+    if sent is not None:
+        return {"worker": sent, "size_mb": mb}
+    # the write runs attached so a failure (disk full, read-only fs) reaches the caller;
+    # only the hold and cleanup are detached. dd avoids a python start-up in the target
+    path = "/tmp/chaos_bloat.dat"
+    setup = docker_exec(
+        name,
+        ["sh", "-c", f"dd if=/dev/zero of={path} bs=1048576 count={mb} || {{ rm -f {path}; exit 1; }}"],
+        detach=False,
     )
-    create = docker_exec(name, ["python", "-c", py], detach=False)
-    cleanup = docker_exec(name, ["sh", "-c", "sleep 10 && rm -f /tmp/chaos_bloat.dat"], detach=True)
-    return {"create": create, "cleanup": cleanup, "size_mb": mb}
+    if setup.get("error"):
+        return {"error": setup["error"], "setup": setup, "size_mb": mb}
+    res = docker_exec(name, ["sh", "-c", f"sleep 10; rm -f {path}"], detach=True)
+    return {"setup": setup, "exec": res, "size_mb": mb}
 
 
 def metrics_block(name: str) -> Dict[str, Any]:
-    port_map = {
-        "testapp_gateway": 5000,
-        "testapp_catalog": 5001,
-        "testapp_cart": 5002,
-        "testapp_payment": 5003,
-    }
-    port = port_map.get(name)
+    port = _TARGET_PORTS.get(name)
     if port is None:
         return {"error": "unknown port"}
-    add = docker_exec(name, ["sh", "-c", f"iptables -I INPUT -p tcp --dport {port} -j DROP || true"], detach=False)
-    fallback = None
-    if add.get("error"):
-        fallback = docker_exec(
-            name,
-            ["python", "-c", "import prometheus_client; prometheus_client.generate_latest=lambda *a,**k: b''"],
-            detach=False,
-        )
-    remove = docker_exec(name, ["sh", "-c", "sleep 15 && iptables -D INPUT 1 || true"], detach=True)
-    return {"iptables_add": add, "fallback_patch": fallback, "iptables_remove": remove}
+    sent = send_to_worker(name, {"op": "iptables_drop", "port": port, "secs": 15})
+    if sent is not None:
+        return {"worker": sent, "port": port}
+    rule = f"INPUT -p tcp --dport {port} -j DROP"
+    # adding the rule runs attached so a missing NET_ADMIN or iptables is reported;
+    # only the hold and removal are detached
+    setup = docker_exec(name, ["sh", "-c", f"iptables -I {rule}"], detach=False)
+    if setup.get("error"):
+        return {"error": setup["error"], "setup": setup, "port": port}
+    res = docker_exec(name, ["sh", "-c", f"sleep 15; iptables -D {rule}"], detach=True)
+    return {"setup": setup, "exec": res, "port": port}
 
 
 def build_focused_executor(fault: str, hog_mem_mb: int | None = None, monitor: Monitor | None = None) -> Callable[[str], Dict[str, Any]]:
@@ -648,10 +1109,10 @@ def main() -> None:
     hog_mem_mb = int(args.hog_mem_mb)
     refresh_every = 10
 
-    monitor = Monitor(log_path=pathlib.Path(args.log_file))
+    monitor = Monitor(log_path=log_path)
     executor = build_focused_executor(fault, hog_mem_mb=hog_mem_mb, monitor=monitor) if mode == "focused" else None
+    uses_worker = mode == "mixed" or fault in WORKER_FAULTS
     actions = build_mixed_actions(hog_mem_mb=hog_mem_mb, monitor=monitor) if mode == "mixed" else None
-    end_time = time.time() + duration
     iteration = 0
     targets = pick_targets(configured_targets)
     if not targets:
@@ -660,10 +1121,10 @@ def main() -> None:
                 ok, reason = monitor.check_target(t)
                 if not ok:
                     monitor.log_violation(action=fault if mode == "focused" else "mixed", target=t, reason=reason or "ineligible target")
-        all_running = list_containers(all=False).get("containers", [])
-        eligible_running = [c.get("Names") for c in all_running if c.get("Names") and not is_monitoring_container(c.get("Names"))]
+        _CONTAINERS.refresh()
+        eligible_running = [n for n in _CONTAINERS.running if not is_monitoring_container(n)]
         summary_reason = "no eligible endpoints available" if not eligible_running else "configured endpoints not eligible"
-        write_log_line(log_path, {
+        monitor.log({
             "ts": time.time(),
             "action": fault if mode == "focused" else "mixed",
             "summary": {
@@ -671,77 +1132,82 @@ def main() -> None:
                 "message": summary_reason,
             }
         })
+        monitor.flush()
         print("No eligible target containers found (after exclusions).")
         return
     stats = Stats()
+    # one slot for the running fault plus the snapshot fan-out beside it
+    # (probe, docker stats, one composite Prometheus query)
+    pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chaos")
+    settle = min(interval / 2, 5)
     print(f"Chaos agent: mode={mode} fault={fault if mode=='focused' else 'mixed'} targets={targets} duration={duration}s interval={interval}s")
-    while time.time() < end_time:
+    # Fixed cadence on the monotonic clock: each iteration starts `interval` after the
+    # previous one started, and an overrunning iteration drops missed ticks instead of drifting.
+    deadline = time.monotonic() + duration
+    next_tick = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now < next_tick:
+            if next_tick >= deadline:
+                break
+            time.sleep(next_tick - now)
+        elif now >= deadline:
+            break
+        next_tick += interval
+        if next_tick < time.monotonic():
+            next_tick = time.monotonic() + interval
         if iteration % refresh_every == 0:
+            _INSTANCE_CACHE.clear()
+            _CONTAINERS.invalidate()
             targets = pick_targets(configured_targets)
             if not targets:
                 print("No targets remaining; exiting.")
                 break
+            if uses_worker:
+                for t in targets:
+                    start_worker(t)
         target = random.choice(targets)
-        before_ms = probe_target(target) if do_probe else None
-        dock_before = docker_stats_once(target)
-        up_before = None
-        inst = discover_instance_for_target(prom_url, prom_job, target) or prom_instance_label(target)
-        metrics_before = None
-        if inst:
-            q = prom_query(prom_url, f"up{{instance=\"{inst}\"}}")
-            try:
-                up_before = float(q.get("data", {}).get("result", [{}])[0].get("value", [None, None])[1])
-            except Exception:
-                up_before = None
-            queries_b = get_prom_queries_for_target(target, inst)
-            if queries_b:
-                metrics_before = eval_prom_queries(prom_url, queries_b)
+        inst = resolve_instance(prom_url, prom_job, target)
+        before = gather_snapshot(pool, prom_url, target, inst, do_probe)
+        before_ms, dock_before, up_before, metrics_before = before["probe_ms"], before["docker"], before["up"], before["prom"]
         if mode == "focused":
-            try:
-                result = executor(target)
-            except Exception as e:
-                result = {"error": str(e)}
-            event = {"ts": time.time(), "action": fault, "target": target, "result": result, "up_before": up_before, "prom_before": metrics_before}
-            log_event(event, json_mode)
-            write_log_line(log_path, event)
+            action_name, action_fn = fault, executor
         else:
             action_name, action_fn = random.choice(list(actions.items()))
-            try:
-                result = action_fn(target)
-            except Exception as e:
-                result = {"error": str(e)}
-            event = {"ts": time.time(), "action": action_name, "target": target, "result": result, "up_before": up_before, "prom_before": metrics_before}
-            log_event(event, json_mode)
-            write_log_line(log_path, event)
+        # Run the fault on the pool and take the "after" snapshot once it has had time to
+        # settle; faults that sleep internally (pause, kill_restart) are observed mid-fault.
+        fault_f = pool.submit(action_fn, target)
+        if settle > 0:
+            time.sleep(settle)
+        after = gather_snapshot(pool, prom_url, target, inst, do_probe)
+        try:
+            result = fault_f.result()
+        except Exception as e:
+            result = {"error": str(e)}
+        event = {"ts": time.time(), "action": action_name, "target": target, "result": result, "up_before": up_before, "prom_before": metrics_before}
+        log_event(event, json_mode)
+        monitor.log(event)
         ok = not bool(event["result"].get("error")) if isinstance(event.get("result"), dict) else True
         stats.add(event["action"], target, ok)
-        after_ms = probe_target(target) if do_probe else None
-        up_after = None
-        metrics_after = None
-        if inst:
-            q2 = prom_query(prom_url, f"up{{instance=\"{inst}\"}}")
-            try:
-                up_after = float(q2.get("data", {}).get("result", [{}])[0].get("value", [None, None])[1])
-            except Exception:
-                up_after = None
-            queries_a = get_prom_queries_for_target(target, inst)
-            if queries_a:
-                metrics_after = eval_prom_queries(prom_url, queries_a)
+        for failure in worker_failures(result):
+            stats.add_failure(WORKER_OP_FAULTS.get(failure.get("op"), "worker"), target)
+        after_ms, dock_after, up_after, metrics_after = after["probe_ms"], after["docker"], after["up"], after["prom"]
         stats.add_prom(metrics_before, metrics_after)
         stats.add_uptime(up_before, up_after)
-        dock_after = docker_stats_once(target)
         event_update = {"ts": time.time(), "action": event["action"], "target": target, "probe_ms": {"before": before_ms, "after": after_ms}, "up": {"before": up_before, "after": up_after}, "prom": {"before": metrics_before, "after": metrics_after}, "docker": {"before": dock_before, "after": dock_after}}
-        write_log_line(log_path, event_update)
+        monitor.log(event_update)
         if do_probe:
             stats.add_probe(before_ms, after_ms)
         stats.add_docker_stats(dock_before if isinstance(dock_before, dict) else None, dock_after if isinstance(dock_after, dict) else None)
+        monitor.flush()
         iteration += 1
-        time.sleep(interval)
+    pool.shutdown(wait=False)
     summary = stats.summary()
     print("Chaos agent finished.")
     print("Summary:")
     print(json.dumps(summary, indent=2))
-    write_log_line(log_path, {"ts": time.time(), "summary": summary})
+    monitor.log({"ts": time.time(), "summary": summary})
+    monitor.flush()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,176 @@
 
 
 from __future__ import annotations
+import http.client
+import itertools
 import json
 import os
+import socket
 import subprocess
+import threading
 import time
+import urllib.parse
 import multiprocessing as mp
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
+
+try:
+	from orjson import loads as _loads
+except ImportError:
+	_loads = json.loads
 
 DOCKER_CMD = os.environ.get("DOCKER_CMD", "docker")
+DOCKER_SOCK = os.environ.get("DOCKER_SOCK", "/var/run/docker.sock")
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+	def __init__(self, path: str, timeout: float = 30) -> None:
+		super().__init__("localhost", timeout=timeout)
+		self.path = path
+
+	def connect(self) -> None:
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		sock.settimeout(self.timeout)
+		try:
+			sock.connect(self.path)
+		except OSError:
+			sock.close()
+			raise
+		self.sock = sock
+
+
+class DockerAPI:
+	"""Docker Engine API over the daemon's Unix socket on one keep-alive connection.
+
+	Saves the fork/exec of a `docker` CLI process per call. Every method returns
+	a `_run_docker`-shaped dict, or None when the socket cannot be reached so callers
+	fall back to the CLI.
+	"""
+
+	def __init__(self, path: str = "/var/run/docker.sock") -> None:
+		self.path = path
+		self._conn: _UnixHTTPConnection | None = None
+		self._lock = threading.Lock()
+
+	def available(self) -> bool:
+		return os.path.exists(self.path)
+
+	def _request(self, method: str, url: str, body: Any = None, timeout: float = 30) -> tuple[int, bytes] | None:
+		if not self.available():
+			return None
+		data = json.dumps(body).encode("utf-8") if body is not None else None
+		headers = {"Content-Type": "application/json"} if data is not None else {}
+		with self._lock:
+			for attempt in (0, 1):
+				conn = self._conn
+				reused = conn is not None
+				if conn is None:
+					conn = self._conn = _UnixHTTPConnection(self.path, timeout=timeout)
+				conn.timeout = timeout
+				if conn.sock is not None:
+					conn.sock.settimeout(timeout)
+				try:
+					conn.request(method, url, body=data, headers=headers)
+					resp = conn.getresponse()
+					payload = resp.read()
+				except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+					conn.close()
+					self._conn = None
+					if reused and attempt == 0:
+						continue
+					return None
+				except (OSError, http.client.HTTPException):
+					conn.close()
+					self._conn = None
+					return None
+				if resp.will_close:
+					conn.close()
+					self._conn = None
+				return resp.status, payload
+		return None
+
+	def _call(self, method: str, url: str, body: Any = None, timeout: float = 30) -> Dict[str, Any] | None:
+		r = self._request(method, url, body, timeout)
+		if r is None:
+			return None
+		status, payload = r
+		text = payload.decode("utf-8", "replace").strip()
+		ok = 200 <= status < 300 or status == 304
+		err = None
+		if not ok:
+			try:
+				err = json.loads(text).get("message") or text
+			except (ValueError, AttributeError):
+				err = text or f"HTTP {status}"
+		return {"cmd": f"{method} {url}", "stdout": text if ok else "", "stderr": "" if ok else text, "rc": 0 if ok else status, "error": err}
+
+	def containers(self, all: bool = False, filters: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any] | None:
+		query = f"all={int(all)}"
+		if filters:
+			query += "&filters=" + urllib.parse.quote(json.dumps(filters))
+		return self._call("GET", f"/containers/json?{query}")
+
+	def pause(self, name: str) -> Dict[str, Any] | None:
+		return self._call("POST", f"/containers/{urllib.parse.quote(name)}/pause")
+
+	def unpause(self, name: str) -> Dict[str, Any] | None:
+		return self._call("POST", f"/containers/{urllib.parse.quote(name)}/unpause")
+
+	def stop(self, name: str, timeout: int = 10) -> Dict[str, Any] | None:
+		return self._call("POST", f"/containers/{urllib.parse.quote(name)}/stop?t={timeout}", timeout=timeout + 30)
+
+	def restart(self, name: str, timeout: int = 10) -> Dict[str, Any] | None:
+		return self._call("POST", f"/containers/{urllib.parse.quote(name)}/restart?t={timeout}", timeout=timeout + 30)
+
+	def update(self, name: str, body: Dict[str, Any]) -> Dict[str, Any] | None:
+		return self._call("POST", f"/containers/{urllib.parse.quote(name)}/update", body)
+
+	def kill(self, name: str) -> Dict[str, Any] | None:
+		return self._call("POST", f"/containers/{urllib.parse.quote(name)}/kill")
+
+	def start(self, name: str) -> Dict[str, Any] | None:
+		return self._call("POST", f"/containers/{urllib.parse.quote(name)}/start")
+
+	def exec(self, name: str, cmd: List[str], detach: bool = True, timeout: float = 30) -> Dict[str, Any] | None:
+		attach = not detach
+		created = self._call(
+			"POST",
+			f"/containers/{urllib.parse.quote(name)}/exec",
+			{"Cmd": cmd, "AttachStdout": attach, "AttachStderr": attach},
+		)
+		if created is None or created["error"]:
+			return created
+		exec_id = json.loads(created["stdout"])["Id"]
+		r = self._request("POST", f"/exec/{exec_id}/start", {"Detach": detach}, timeout=timeout)
+		if r is None:
+			return None
+		status, payload = r
+		label = f"exec {name} {' '.join(cmd)}"
+		if status >= 300:
+			text = payload.decode("utf-8", "replace").strip()
+			return {"cmd": label, "stdout": "", "stderr": text, "rc": status, "error": text or f"HTTP {status}"}
+		if detach:
+			return {"cmd": label, "stdout": "", "stderr": "", "rc": 0, "error": None}
+		out, err = _demux(payload)
+		info = self._call("GET", f"/exec/{exec_id}/json")
+		rc = -1
+		if info is not None and not info["error"]:
+			rc = json.loads(info["stdout"]).get("ExitCode", -1)
+		return {"cmd": label, "stdout": out, "stderr": err, "rc": rc, "error": None if rc == 0 else err or f"exit {rc}"}
+
+
+def _demux(payload: bytes) -> tuple[str, str]:
+	"""Split Docker's multiplexed exec stream (8-byte frame headers) into stdout/stderr."""
+	streams = {1: bytearray(), 2: bytearray()}
+	i = 0
+	while i + 8 <= len(payload):
+		kind = payload[i]
+		size = int.from_bytes(payload[i + 4:i + 8], "big")
+		streams.get(kind, streams[1]).extend(payload[i + 8:i + 8 + size])
+		i += 8 + size
+	return streams[1].decode("utf-8", "replace").strip(), streams[2].decode("utf-8", "replace").strip()
+
+
+_API = DockerAPI(DOCKER_SOCK)
 
 
 def _run_docker(args: List[str], timeout: int = 30) -> Dict[str, Optional[str]]:
@@ -36,54 +198,119 @@ def _run_docker(args: List[str], timeout: int = 30) -> Dict[str, Optional[str]]:
 		return {"cmd": " ".join(cmd), "stdout": None, "stderr": None, "rc": -1, "error": f"Unexpected error: {e}"}
 
 
-def list_containers(all: bool = False) -> Dict[str, object]:
+def _ps_row(c: Dict[str, Any]) -> Dict[str, Any]:
+	"""Reshape an Engine API container entry like a `docker ps --format '{{json .}}'` line."""
+	return {
+		"ID": (c.get("Id") or "")[:12],
+		"Image": c.get("Image"),
+		"Command": c.get("Command"),
+		"Names": ",".join(n.lstrip("/") for n in c.get("Names") or []),
+		"State": c.get("State"),
+		"Status": c.get("Status"),
+	}
+
+
+def list_containers(all: bool = False, filters: Optional[Dict[str, List[str]]] = None) -> Dict[str, object]:
+	"""`filters` are docker ps filters ({"name": ["cart", "payment"]}), applied by the daemon."""
+	res = _API.containers(all=all, filters=filters)
+	if res is not None:
+		containers: List[Dict[str, Any]] = []
+		if not res["error"]:
+			try:
+				containers = [_ps_row(c) for c in _loads(res["stdout"])]
+			except (ValueError, TypeError):
+				pass
+		return {"containers": containers, "error": res["error"], "raw": res}
 	format_str = "{{json .}}"
 	args = ["ps", "--format", format_str]
 	if all:
 		args.insert(1, "-a")
+	for key, values in (filters or {}).items():
+		for value in values:
+			args += ["--filter", f"{key}={value}"]
 	result = _run_docker(args)
-	containers: List[Dict[str, str]] = []
+	containers = []
 	if result["stdout"] and not result["error"]:
 		for line in result["stdout"].splitlines():
-			line = line.strip()
 			if not line:
 				continue
 			try:
-				containers.append(json.loads(line))
-			except Exception:
+				containers.append(_loads(line))
+			except ValueError:
 				pass
 	return {"containers": containers, "error": result["error"], "raw": result}
 
 
 def kill_container(name_or_id: str) -> Dict[str, object]:
-	return _run_docker(["kill", name_or_id])
+	return _API.kill(name_or_id) or _run_docker(["kill", name_or_id])
 
 
 def stop_container(name_or_id: str, timeout: int = 10) -> Dict[str, object]:
-	return _run_docker(["stop", "-t", str(timeout), name_or_id])
+	return _API.stop(name_or_id, timeout) or _run_docker(["stop", "-t", str(timeout), name_or_id])
 
 
 def restart_container(name_or_id: str) -> Dict[str, object]:
-	return _run_docker(["restart", name_or_id])
+	return _API.restart(name_or_id) or _run_docker(["restart", name_or_id])
 
 
 def pause_container(name_or_id: str) -> Dict[str, object]:
-	return _run_docker(["pause", name_or_id])
+	return _API.pause(name_or_id) or _run_docker(["pause", name_or_id])
 
 
 def unpause_container(name_or_id: str) -> Dict[str, object]:
-	return _run_docker(["unpause", name_or_id])
+	return _API.unpause(name_or_id) or _run_docker(["unpause", name_or_id])
+
+
+
+def _burn_py(n: int) -> int:
+	return sum(range(n))
+
+
+try:
+	from numba import njit
+except ImportError:
+	_burn = _burn_py
+else:
+	@njit(cache=True, nogil=True)
+	def _burn(n):
+		# native FP loop; returns x so the compiler cannot drop it
+		x = 1.0
+		for _ in range(n):
+			x = x * 1.0000001 + 1.0
+		return x
+
+
+_ITERS_PER_MS: Optional[int] = None
+
 
+def _iters_per_ms() -> int:
+	"""How many `_burn` steps fit in 1 ms; measured once per process."""
+	global _ITERS_PER_MS
+	if _ITERS_PER_MS is None:
+		_burn(1)  # numba compiles on first call; keep that out of the measurement
+		n = 200_000
+		t0 = time.perf_counter()
+		_burn(n)
+		elapsed_ms = max((time.perf_counter() - t0) * 1000.0, 1e-3)
+		_ITERS_PER_MS = max(1, int(n / elapsed_ms))
+	return _ITERS_PER_MS
 
 
-def cpu_worker(stop_time: float, utilization_hint: float) -> None:
+def cpu_worker(stop_time: Any, utilization_hint: float) -> None:
+	"""Burn CPU until `stop_time`; a shared `mp.Value('d')` deadline can be set to 0.0 to stop early."""
+	shared = stop_time if hasattr(stop_time, "value") else None
 	spin_fraction = max(0.0, min(1.0, utilization_hint))
 	sleep_fraction = 1.0 - spin_fraction
 	cycle = 0.001
-	while time.time() < stop_time:
-		end_spin = time.time() + cycle * spin_fraction
-		while time.time() < end_spin:
-			pass
+	# burn the spin share of each cycle in one C-level loop; the clock is read every 16 cycles
+	burn_iters = int(_iters_per_ms() * cycle * 1000 * spin_fraction)
+	stop = shared.value if shared is not None else stop_time
+	deadline_ns = time.perf_counter_ns() + int(max(0.0, stop - time.time()) * 1e9)
+	for i in itertools.count():
+		if (i & 15) == 0 and (time.perf_counter_ns() >= deadline_ns or (shared is not None and shared.value <= 0.0)):
+			break
+		if burn_iters:
+			_burn(burn_iters)
 		if sleep_fraction > 0:
 			time.sleep(cycle * sleep_fraction)
 
@@ -91,15 +318,20 @@ def cpu_worker(stop_time: float, utilization_hint: float) -> None:
 def hog_cpu(duration_seconds: int = 10, workers: int = 1, utilization_hint: float = 1.0) -> Dict[str, object]:
 	if workers < 1:
 		return {"error": "workers must be >= 1"}
-	stop_time = time.time() + max(0, duration_seconds)
-	processes: List[mp.Process] = []
+	# fork skips re-importing this module in every worker (spawn is the default on macOS/Windows)
+	ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else mp.get_context()
+	stop_val = ctx.Value("d", time.time() + max(0, duration_seconds), lock=False)
+	_iters_per_ms()  # calibrate once here so forked workers inherit it
+	processes = []
 	for _ in range(workers):
-		p = mp.Process(target=cpu_worker, args=(stop_time, utilization_hint))
+		p = ctx.Process(target=cpu_worker, args=(stop_val, utilization_hint))
 		p.daemon = True
 		p.start()
 		processes.append(p)
 	for p in processes:
 		p.join(timeout=max(0, duration_seconds) + 1)
+	# release any straggler
+	stop_val.value = 0.0
 	return {
 		"workers": workers,
 		"duration": duration_seconds,
@@ -4,10 +4,14 @@ Fault Agent Wrapper
 Maps Control Plane parameters to chaos_agent.py
 """
 import argparse
+import re
+import select
 import subprocess
 import sys
 import os
 
+from docker_functions import list_containers
+
 
 def main():
     parser = argparse.ArgumentParser(description='Fault Agent - Chaos Engineering')
@@ -20,15 +24,18 @@ def main():
 
     args = parser.parse_args()
 
-    print("=" * 70)
-    print("FAULT AGENT - Chaos Injection Wrapper")
-    print("=" * 70)
-    print(f"Fault Type:   {args.fault_type}")
-    print(f"Target:       {args.target}")
-    print(f"Duration:     {args.duration}s")
-    print(f"Mode:         {args.mode}")
-    print(f"Intensity:    {args.intensity}%")
-    print("=" * 70)
+    rule = "=" * 70
+    print(
+        f"{rule}\n"
+        "FAULT AGENT - Chaos Injection Wrapper\n"
+        f"{rule}\n"
+        f"Fault Type:   {args.fault_type}\n"
+        f"Target:       {args.target}\n"
+        f"Duration:     {args.duration}s\n"
+        f"Mode:         {args.mode}\n"
+        f"Intensity:    {args.intensity}%\n"
+        f"{rule}"
+    )
 
     if args.mode == 'dry-run':
         print("\n[DRY-RUN] Simulating fault injection...")
@@ -55,13 +62,16 @@ def main():
         print("[INFO] Defaulting to gateway container...")
         targets = "cep-gateway"
 
-    print(f"\n[CHAOS AGENT] Executing fault injection...")
-    print(f"[CHAOS AGENT] Fault: {chaos_fault}")
-    print(f"[CHAOS AGENT] Targets: {targets}")
+    print(
+        "\n[CHAOS AGENT] Executing fault injection...\n"
+        f"[CHAOS AGENT] Fault: {chaos_fault}\n"
+        f"[CHAOS AGENT] Targets: {targets}"
+    )
 
     # Build chaos_agent.py command
     chaos_cmd = [
         'python3',
+        '-u',  # unbuffered: the orchestrator reads our output line by line while the run is live
         '/app/backend/chaos_agent.py',
         '--mode', 'focused',
         '--fault', chaos_fault,
@@ -70,70 +80,85 @@ def main():
         '--interval', str(max(5, args.duration // 2)),  # Half duration or 5s min
     ]
 
+    print(f"\n{rule}\nCHAOS AGENT OUTPUT:\n{rule}", flush=True)
+
     try:
-        # Execute chaos_agent.py
-        result = subprocess.run(
-            chaos_cmd,
-            capture_output=True,
-            text=True,
-            timeout=args.duration + 30
-        )
-
-        print("\n" + "=" * 70)
-        print("CHAOS AGENT OUTPUT:")
-        print("=" * 70)
-        print(result.stdout)
-
-        if result.stderr:
-            print("\nSTDERR:")
-            print(result.stderr)
-
-        if result.returncode == 0:
-            print("\n✅ Fault injection completed successfully")
-        else:
-            print(f"\n❌ Fault injection failed with code {result.returncode}")
-
-        return result.returncode
-
-    except subprocess.TimeoutExpired:
-        print(f"\n⚠️  Chaos agent timed out after {args.duration + 30}s")
-        return 1
+        # Execute chaos_agent.py; its output streams straight through instead of being buffered
+        proc = subprocess.Popen(chaos_cmd)
     except Exception as e:
         print(f"\n❌ Error executing chaos agent: {e}")
         return 1
 
+    timeout = args.duration + 30
+    if not wait_for_exit(proc, timeout):
+        proc.kill()
+        proc.wait()
+        print(f"\n⚠️  Chaos agent timed out after {timeout}s")
+        return 1
+
+    if proc.returncode == 0:
+        print("\n✅ Fault injection completed successfully")
+    else:
+        print(f"\n❌ Fault injection failed with code {proc.returncode}")
+
+    return proc.returncode
+
+
+def wait_for_exit(proc, timeout):
+    """
+    Wait up to `timeout` seconds for `proc` to exit; True if it did.
+
+    Blocks on a pidfd (Linux 5.3+, Python 3.9+) so the wake-up is event-driven;
+    falls back to Popen.wait elsewhere.
+    """
+    try:
+        fd = os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        try:
+            proc.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    try:
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        if not poller.poll(timeout * 1000):
+            return False
+    finally:
+        os.close(fd)
+    proc.wait()
+    return True
+
+
+SERVICE_NAMES = ('gateway', 'catalog', 'cart', 'payment')
+EXCLUDED_NAMES = ('prometheus', 'grafana', 'postgres', 'backend', 'frontend')
+
 
 def discover_targets(target_hint):
     """
     Discover containers based on target hint
     """
-    import subprocess
-
     try:
-        result = subprocess.run(
-            ['docker', 'ps', '--format', '{{.Names}}'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-
-        containers = result.stdout.strip().split('\n')
+        # let the daemon drop everything that cannot match before it is sent and parsed
+        hint = target_hint.lower()
+        listing = list_containers(filters={'name': [re.escape(hint), *SERVICE_NAMES]})
+        if listing['error']:
+            raise RuntimeError(listing['error'])
+        containers = [c.get('Names', '') for c in listing['containers']]
 
         # Filter containers based on target hint
         matching = []
         for container in containers:
-            if (target_hint.lower() in container.lower() or
-                'gateway' in container.lower() or
-                'catalog' in container.lower() or
-                'cart' in container.lower() or
-                'payment' in container.lower()):
-
-                # Exclude monitoring containers
-                if not any(x in container.lower() for x in ['prometheus', 'grafana', 'postgres', 'backend', 'frontend']):
-                    matching.append(container)
+            name = container.lower()
+            if ((hint in name or any(a in name for a in SERVICE_NAMES))
+                    # Exclude monitoring containers
+                    and not any(x in name for x in EXCLUDED_NAMES)):
+                matching.append(container)
+                if len(matching) == 2:  # Limit to 2 containers for safety
+                    break
 
         if matching:
-            return ','.join(matching[:2])  # Limit to 2 containers for safety
+            return ','.join(matching)
 
         return None
 
@@ -4,42 +4,109 @@ Load Testing Script for Chaos Engineering Platform
 Tests the REST API under various load conditions
 """
 
+import asyncio
+import math
+import random
 import requests
+import sys
+import threading
 import time
 import statistics
+from requests.adapters import HTTPAdapter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Configuration
 BASE_URL = "http://localhost:8080"
 HEALTH_ENDPOINT = f"{BASE_URL}/api/health"
 EXPERIMENTS_ENDPOINT = f"{BASE_URL}/api/experiments"
 
+_tls = threading.local()
+
+def _session():
+    """Per-thread requests.Session so connections are kept alive and reused"""
+    session = getattr(_tls, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _tls.session = session
+    return session
+
 class LoadTestResults:
+    RESERVOIR_SIZE = 10000
+
     def __init__(self):
+        # bounded uniform sample for the median; count/mean/std/min/max are kept online
         self.response_times = []
         self.successful_requests = 0
         self.failed_requests = 0
         self.start_time = None
         self.end_time = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = math.inf
+        self._max = -math.inf
 
     def add_result(self, success, response_time):
-        if success:
-            self.successful_requests += 1
+        if not success:
+            self.failed_requests += 1
+            return
+        self.successful_requests += 1
+        n = self.successful_requests
+
+        # Welford's update keeps mean and variance exact without storing every sample
+        delta = response_time - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (response_time - self._mean)
+        if response_time < self._min:
+            self._min = response_time
+        if response_time > self._max:
+            self._max = response_time
+
+        # reservoir sampling (Algorithm R): exact until full, uniform sample afterwards
+        if n <= self.RESERVOIR_SIZE:
             self.response_times.append(response_time)
         else:
-            self.failed_requests += 1
+            j = random.randrange(n)
+            if j < self.RESERVOIR_SIZE:
+                self.response_times[j] = response_time
+
+    def _summarize(self):
+        """Return (min, max, mean, median, sample std) of the response times"""
+        n = self.successful_requests
+        std = math.sqrt(self._m2 / (n - 1)) if n > 1 else 0
+        times = self.response_times
+        median = float(np.median(times)) if np is not None else statistics.median(times)
+        return self._min, self._max, self._mean, median, std
 
     def calculate_statistics(self):
-        if not self.response_times:
+        if not self.successful_requests:
             return None
 
+        t_min, t_max, t_mean, t_median, t_std = self._summarize()
         return {
-            'min': min(self.response_times),
-            'max': max(self.response_times),
-            'mean': statistics.mean(self.response_times),
-            'median': statistics.median(self.response_times),
-            'std_dev': statistics.stdev(self.response_times) if len(self.response_times) > 1 else 0,
+            'min': t_min,
+            'max': t_max,
+            'mean': t_mean,
+            'median': t_median,
+            'std_dev': t_std,
             'total_requests': self.successful_requests + self.failed_requests,
             'successful': self.successful_requests,
             'failed': self.failed_requests,
@@ -48,34 +115,89 @@ class LoadTestResults:
 
 def make_request(url, method='GET', data=None):
     """Make a single HTTP request and measure response time"""
-    start = time.time()
+    session = _session()
+    success = False
+    start = time.perf_counter_ns()
     try:
         if method == 'GET':
-            response = requests.get(url, timeout=10)
+            response = session.get(url, timeout=10)
         elif method == 'POST':
-            response = requests.post(url, json=data, timeout=10)
-
-        end = time.time()
-        response_time = (end - start) * 1000  # Convert to milliseconds
-
+            response = session.post(url, json=data, timeout=10)
         success = response.status_code < 400
-        return success, response_time
-    except Exception as e:
-        end = time.time()
-        response_time = (end - start) * 1000
-        return False, response_time
+    except Exception:
+        pass
+    return success, (time.perf_counter_ns() - start) * 1e-6  # milliseconds
+
+async def _timed_get(session, url):
+    """Async counterpart of make_request"""
+    start = time.perf_counter_ns()
+    try:
+        async with session.get(url) as response:
+            await response.read()
+            success = response.status < 400
+    except Exception:
+        success = False
+    return success, (time.perf_counter_ns() - start) / 1e6
+
+async def _gather_requests(url, num_requests, concurrency, results):
+    """Issue num_requests GETs on one event loop from `concurrency` workers, recording each as it completes"""
+    timeout = aiohttp.ClientTimeout(total=10)
+    remaining = num_requests
+
+    async def worker(session):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            results.add_result(*await _timed_get(session, url))
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await asyncio.gather(*(worker(session) for _ in range(min(concurrency, num_requests))))
+
+async def _paced_requests(url, duration_seconds, requests_per_second, results):
+    """Start one GET every 1/rps seconds; a slow response never delays the next send"""
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / requests_per_second
+    timeout = aiohttp.ClientTimeout(total=10)
+    # no connector limit: with aiohttp's default (100) a request beyond that waits for a
+    # connection after its timer started, which hides server slowness as client queueing
+    connector = aiohttp.TCPConnector(limit=0)
+    # only in-flight tasks are held; each result goes to `results` as its task finishes
+    in_flight = set()
+
+    def record(task):
+        in_flight.discard(task)
+        results.add_result(*task.result())
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        next_send = loop.time()
+        end_time = next_send + duration_seconds
+        while next_send < end_time:
+            delay = next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(_timed_get(session, url))
+            in_flight.add(task)
+            task.add_done_callback(record)
+            next_send += interval
+        if in_flight:
+            await asyncio.wait(in_flight)
 
 def test_concurrent_load(url, num_requests, num_threads):
-    """Test concurrent load with multiple threads"""
+    """Test concurrent load with num_threads requests in flight"""
     results = LoadTestResults()
     results.start_time = time.time()
 
-    with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        futures = [executor.submit(make_request, url) for _ in range(num_requests)]
+    if aiohttp is not None:
+        # all in-flight requests share one event loop and a keep-alive connection pool
+        asyncio.run(_gather_requests(url, num_requests, num_threads, results))
+    else:
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            futures = [executor.submit(make_request, url) for _ in range(num_requests)]
 
-        for future in as_completed(futures):
-            success, response_time = future.result()
-            results.add_result(success, response_time)
+            for future in as_completed(futures):
+                success, response_time = future.result()
+                results.add_result(success, response_time)
 
     results.end_time = time.time()
     return results
@@ -85,18 +207,28 @@ def test_sustained_load(url, duration_seconds, requests_per_second):
     results = LoadTestResults()
     results.start_time = time.time()
 
-    end_time = time.time() + duration_seconds
+    if aiohttp is not None:
+        # open loop: sends follow the schedule and overruns overlap instead of slipping it
+        asyncio.run(_paced_requests(url, duration_seconds, requests_per_second, results))
+        results.end_time = time.time()
+        return results
+
+    end_time = time.perf_counter() + duration_seconds
     request_interval = 1.0 / requests_per_second
+    next_send = time.perf_counter()
 
-    while time.time() < end_time:
-        request_start = time.time()
+    while next_send < end_time:
         success, response_time = make_request(url)
         results.add_result(success, response_time)
 
-        # Sleep to maintain target request rate
-        elapsed = time.time() - request_start
-        sleep_time = max(0, request_interval - elapsed)
-        time.sleep(sleep_time)
+        # Sleep until the next slot on a fixed schedule so slow requests don't lower the rate
+        next_send += request_interval
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -1.0:
+            # too far behind to catch up; restart the schedule from now
+            next_send = time.perf_counter()
 
     results.end_time = time.time()
     return results
@@ -111,27 +243,31 @@ def print_results(test_name, results):
     duration = results.end_time - results.start_time
     throughput = stats['total_requests'] / duration
 
-    print(f"\n{'='*70}")
-    print(f"{test_name}")
-    print(f"{'='*70}")
-    print(f"Duration:           {duration:.2f} seconds")
-    print(f"Total Requests:     {stats['total_requests']}")
-    print(f"Successful:         {stats['successful']}")
-    print(f"Failed:             {stats['failed']}")
-    print(f"Success Rate:       {stats['success_rate']:.2f}%")
-    print(f"Throughput:         {throughput:.2f} req/s")
-    print(f"\nResponse Times (ms):")
-    print(f"  Min:              {stats['min']:.2f}")
-    print(f"  Max:              {stats['max']:.2f}")
-    print(f"  Mean:             {stats['mean']:.2f}")
-    print(f"  Median:           {stats['median']:.2f}")
-    print(f"  Std Dev:          {stats['std_dev']:.2f}")
-    print(f"{'='*70}")
+    # build the block first and write it once
+    lines = [
+        f"\n{'='*70}",
+        f"{test_name}",
+        f"{'='*70}",
+        f"Duration:           {duration:.2f} seconds",
+        f"Total Requests:     {stats['total_requests']}",
+        f"Successful:         {stats['successful']}",
+        f"Failed:             {stats['failed']}",
+        f"Success Rate:       {stats['success_rate']:.2f}%",
+        f"Throughput:         {throughput:.2f} req/s",
+        f"\nResponse Times (ms):",
+        f"  Min:              {stats['min']:.2f}",
+        f"  Max:              {stats['max']:.2f}",
+        f"  Mean:             {stats['mean']:.2f}",
+        f"  Median:           {stats['median']:.2f}",
+        f"  Std Dev:          {stats['std_dev']:.2f}",
+        f"{'='*70}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def check_server_availability():
     """Check if the server is running"""
     try:
-        response = requests.get(HEALTH_ENDPOINT, timeout=5)
+        response = _session().get(HEALTH_ENDPOINT, timeout=5)
         if response.status_code == 200:
             print("✓ Server is running and responding")
             return True
@@ -153,6 +289,9 @@ def main():
     if not check_server_availability():
         return
 
+    if aiohttp is not None and uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     print("\nStarting load tests...\n")
 
     # Test 1: Baseline Performance (Single Request)
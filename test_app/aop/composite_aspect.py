@@ -0,0 +1,92 @@
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from aop.health_info_aspect import HealthInfoAspect
+from aop.logging_aspect import LoggingAspect
+from aop.methods import iter_public_methods
+from aop.metrics_aspect import MetricsAspect
+
+
+class CompositeAspect:
+    """Applies logging, metrics and health tracking through one wrapper per method.
+
+    Stacking the aspects one after another puts a wrapper frame (and its own
+    try/except) per aspect on every call. Here the advice of each is inlined into a
+    single frame, in the same order the stacked wrappers ran: logging innermost,
+    then metrics, then health. Any other aspect in the list is applied with its own
+    ``apply`` underneath the fused wrapper.
+    """
+
+    def __init__(self, aspects: Iterable[Any]):
+        self.logging: Optional[LoggingAspect] = None
+        self.metrics: Optional[MetricsAspect] = None
+        self.health: Optional[HealthInfoAspect] = None
+        self.others = []
+        for aspect in aspects:
+            if isinstance(aspect, LoggingAspect):
+                self.logging = aspect
+            elif isinstance(aspect, MetricsAspect):
+                self.metrics = aspect
+            elif isinstance(aspect, HealthInfoAspect):
+                self.health = aspect
+            else:
+                self.others.append(aspect)
+
+    def apply(self, func: Callable, service) -> Callable:
+        for aspect in self.others:
+            func = aspect.apply(func)
+        method_name = getattr(func, "__name__", str(func))
+
+        log = self.logging
+        log_calls = log is not None and (log.log_args or log.log_result or log.timing)
+        log_timing = log_calls and log.timing
+
+        req_inc = err_inc = observe = None
+        if self.metrics is not None:
+            req_child, err_child, latency_child = self.metrics._ensure_metrics(service, method_name)
+            if req_child is not None and err_child is not None and latency_child is not None:
+                req_inc, err_inc, observe = req_child.inc, err_child.inc, latency_child.observe
+
+        health = self.health
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            if health is not None:
+                health.call_count += 1
+            if log_calls:
+                log.before_method(method_name, args, kwargs)
+            start = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if log is not None:
+                    log.on_exception(method_name, e)
+                if err_inc is not None:
+                    err_inc()
+                if health is not None:
+                    health._on_exception(e)
+                raise
+            finally:
+                elapsed = perf_counter() - start
+                if observe is not None:
+                    observe(elapsed)
+                    req_inc()
+            if log_calls:
+                log.after_method(method_name, result, elapsed * 1e3 if log_timing else None)
+            if health is not None:
+                health._on_success()
+            return result
+
+        wrapper.__name__ = method_name
+        wrapper.__qualname__ = getattr(func, "__qualname__", method_name)
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def apply_to_public_methods(
+        self,
+        obj: Any,
+        include: Optional[list[str]] = None,
+        exclude: Optional[list[str]] = None,
+    ) -> None:
+        for attr, val in iter_public_methods(obj, include, exclude):
+            setattr(obj, attr, self.apply(val, obj))
@@ -1,9 +1,9 @@
-import functools
 import os
 import platform
 import time
 from typing import Any, Callable, Optional
 
+from aop.methods import iter_public_methods
 from common.db import db_available
 
 
@@ -12,6 +12,16 @@ class HealthInfoAspect:
         self.service = service
         self.version = version
         self.start_time = time.time()
+        # name/port/version/pid never change after startup; only the rest is filled per request
+        self._svc_name = getattr(service, "name", None)
+        self._svc_port = getattr(service, "port", None)
+        self._info_template = {
+            "service": self._svc_name,
+            "port": self._svc_port,
+            "version": version,
+            "python": platform.python_version(),
+            "pid": os.getpid(),
+        }
         self.healthy = True
         self.last_error: Optional[str] = None
         self.last_error_ts: Optional[float] = None
@@ -30,7 +40,6 @@ class HealthInfoAspect:
         self.error_count += 1
 
     def apply(self, func: Callable) -> Callable:
-        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             self.call_count += 1
             try:
@@ -40,6 +49,9 @@ class HealthInfoAspect:
                 raise
             self._on_success()
             return result
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = getattr(func, "__qualname__", func.__name__)
+        wrapper.__wrapped__ = func
         return wrapper
 
     def apply_to_public_methods(
@@ -48,17 +60,8 @@ class HealthInfoAspect:
         include: Optional[list[str]] = None,
         exclude: Optional[list[str]] = None,
     ) -> None:
-        exclude = set(exclude or [])
-        for attr in dir(obj):
-            if attr.startswith("_"):
-                continue
-            if include is not None and attr not in include:
-                continue
-            if attr in exclude:
-                continue
-            val = getattr(obj, attr, None)
-            if callable(val):
-                setattr(obj, attr, self.apply(val))
+        for attr, val in iter_public_methods(obj, include, exclude):
+            setattr(obj, attr, self.apply(val))
 
     def _uptime_sec(self) -> int:
         return int(time.time() - self.start_time)
@@ -66,8 +69,8 @@ class HealthInfoAspect:
     def get_health(self) -> dict:
         return {
             "status": "ok" if self.healthy else "degraded",
-            "service": getattr(self.service, "name", None),
-            "port": getattr(self.service, "port", None),
+            "service": self._svc_name,
+            "port": self._svc_port,
             "uptime_sec": self._uptime_sec(),
             "calls": self.call_count,
             "errors": self.error_count,
@@ -78,12 +81,7 @@ class HealthInfoAspect:
         }
 
     def get_info(self) -> dict:
-        return {
-            "service": getattr(self.service, "name", None),
-            "port": getattr(self.service, "port", None),
-            "version": self.version,
-            "uptime_sec": self._uptime_sec(),
-            "python": platform.python_version(),
-            "pid": os.getpid(),
-            "db_available": bool(db_available()),
-        }
+        info = self._info_template.copy()
+        info["uptime_sec"] = self._uptime_sec()
+        info["db_available"] = bool(db_available())
+        return info
@@ -1,8 +1,13 @@
-import functools
 import time
 import traceback
 from typing import Any, Callable, Iterable, Optional
 
+from aop.methods import iter_public_methods
+
+
+# builtin scalars whose repr is short and cannot raise
+_SHORT_REPR_TYPES = (bool, int, float)
+
 
 class LoggingAspect:
     def __init__(self, logger: Optional[Callable[[str], None]] = None, timing: bool = True, log_args: bool = True, log_result: bool = True):
@@ -32,12 +37,15 @@ class LoggingAspect:
         if self.log_result:
             # avoid logging overly large payloads
             r = result
-            try:
+            if r is None or type(r) in _SHORT_REPR_TYPES:
                 preview = repr(r)
-            except Exception:
-                preview = f"<unrepr {type(r).__name__}>"
-            if preview and len(preview) > 300:
-                preview = preview[:297] + "..."
+            else:
+                try:
+                    preview = repr(r)
+                except Exception:
+                    preview = f"<unrepr {type(r).__name__}>"
+                if preview and len(preview) > 300:
+                    preview = preview[:297] + "..."
             self._emit(f"after {method_name} result={preview}{timing_part}")
         else:
             self._emit(f"after {method_name}{timing_part}")
@@ -47,20 +55,31 @@ class LoggingAspect:
         self._emit(f"exception in {method_name}: {exception}\n{tb}")
 
     def apply(self, func: Callable) -> Callable:
+        method_name = getattr(func, "__name__", str(func))
+        # with args, result and timing all off there is nothing per call worth a line; only errors are logged
+        quiet = not (self.log_args or self.log_result or self.timing)
 
-        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            self.before_method(getattr(func, "__name__", str(func)), args, kwargs)
-            start = time.time() if self.timing else None
+            if quiet:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:  # pragma: no cover - logging path
+                    self.on_exception(method_name, e)
+                    raise
+            self.before_method(method_name, args, kwargs)
+            start = time.perf_counter_ns() if self.timing else None
             try:
                 result = func(*args, **kwargs)
             except Exception as e:  # pragma: no cover - logging path
-                self.on_exception(getattr(func, "__name__", str(func)), e)
+                self.on_exception(method_name, e)
                 raise
-            elapsed = (time.time() - start) * 1000 if start is not None else None
-            self.after_method(getattr(func, "__name__", str(func)), result, elapsed)
+            elapsed = (time.perf_counter_ns() - start) / 1e6 if start is not None else None
+            self.after_method(method_name, result, elapsed)
             return result
 
+        wrapper.__name__ = method_name
+        wrapper.__qualname__ = getattr(func, "__qualname__", method_name)
+        wrapper.__wrapped__ = func
         return wrapper
 
     def apply_to_public_methods(
@@ -69,18 +88,5 @@ class LoggingAspect:
         include: Optional[list[str]] = None,
         exclude: Optional[list[str]] = None,
     ) -> None:
-        exclude = set(exclude or [])
-        for attr in dir(obj):
-            if attr.startswith("_"):
-                continue
-            if include is not None and attr not in include:
-                continue
-            if attr in exclude:
-                continue
-            try:
-                val = getattr(obj, attr)
-            except Exception:
-                continue
-            if callable(val):
-                wrapped = self.apply(val)
-                setattr(obj, attr, wrapped)
\ No newline at end of file
+        for attr, val in iter_public_methods(obj, include, exclude):
+            setattr(obj, attr, self.apply(val))
@@ -0,0 +1,34 @@
+import itertools
+import types
+from typing import Any, Callable, Iterator, Optional
+
+
+def iter_public_methods(
+    obj: Any,
+    include: Optional[list[str]] = None,
+    exclude: Optional[list[str]] = None,
+) -> Iterator[tuple[str, Callable]]:
+    """Yield (name, callable) for each public method of obj that an aspect should wrap.
+
+    Instance attributes come first (earlier aspects set their wrappers there), then
+    the MRO. Class attributes are read raw, so properties are never evaluated and
+    only functions, staticmethods and classmethods are bound.
+    """
+    exclude_set = set(exclude or [])
+    cls = type(obj)
+    instance_attrs = getattr(obj, "__dict__", {})
+    seen = set()
+    for source in itertools.chain((instance_attrs,), (vars(k) for k in cls.__mro__)):
+        for attr, raw in list(source.items()):
+            if attr in seen or attr.startswith("_"):
+                continue
+            seen.add(attr)
+            if include is not None and attr not in include:
+                continue
+            if attr in exclude_set:
+                continue
+            if source is instance_attrs:
+                if callable(raw):
+                    yield attr, raw
+            elif isinstance(raw, (types.FunctionType, staticmethod, classmethod)):
+                yield attr, raw.__get__(obj, cls)
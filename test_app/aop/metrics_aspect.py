@@ -1,15 +1,26 @@
-import functools
 import time
+import weakref
 from typing import Any, Callable, Iterable, Optional
 
+from aop.methods import iter_public_methods
+
 
 class MetricsAspect:
     def __init__(self):
-        self._cache = {}
+        # per-service entries die with the service, so a recycled id() never aliases them
+        self._cache = weakref.WeakKeyDictionary()
+        self._pinned = {}
+
+    def _service_cache(self, service) -> dict:
+        try:
+            return self._cache.setdefault(service, {})
+        except TypeError:
+            # not weak-referenceable: pin the service next to its entry so its id stays unique
+            return self._pinned.setdefault(id(service), (service, {}))[1]
 
-    def _ensure_metrics(self, service) -> tuple:
-        key = id(service)
-        cached = self._cache.get(key)
+    def _families(self, service) -> tuple:
+        entry = self._service_cache(service)
+        cached = entry.get(None)
         if cached:
             return cached
 
@@ -29,41 +40,58 @@ class MetricsAspect:
                 "Method call latency (seconds)",
                 label_names=["service", "method"],
             )
-        except Exception:
+        except Exception as _e:
+            print(f"[metrics_aspect] failed to register metrics for {getattr(service, 'name', service)}: {_e}")
             req_counter = err_counter = latency_hist = None
-        self._cache[key] = (req_counter, err_counter, latency_hist)
-        return self._cache[key]
+        entry[None] = (req_counter, err_counter, latency_hist)
+        return entry[None]
+
+    def _ensure_metrics(self, service, method_name: str) -> tuple:
+        """Children of the service's metric families labelled for one method, resolved once."""
+        entry = self._service_cache(service)
+        cached = entry.get(method_name)
+        if cached:
+            return cached
+
+        children = []
+        for family in self._families(service):
+            child = None
+            if family is not None:
+                try:
+                    child = family.labels(service=service.name, method=method_name)
+                except Exception as _e:
+                    print(f"[metrics_aspect] failed to bind labels for {getattr(service, 'name', service)}.{method_name}: {_e}")
+            children.append(child)
+        entry[method_name] = tuple(children)
+        return entry[method_name]
 
     def apply(self, func: Callable, service) -> Callable:
+        method_name = getattr(func, "__name__", str(func))
+        req_child, err_child, latency_child = self._ensure_metrics(service, method_name)
+        if req_child is None or err_child is None or latency_child is None:
+            # registration failed (already reported once); leave the method uninstrumented
+            return func
+        # bound methods of the labelled children, so the wrapper makes no lookups per call
+        req_inc = req_child.inc
+        err_inc = err_child.inc
+        observe = latency_child.observe
+        perf_counter = time.perf_counter
 
-        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            req_counter, err_counter, latency_hist = self._ensure_metrics(service)
-            method_name = getattr(func, "__name__", str(func))
-            start = time.time()
+            start = perf_counter()
             try:
-                result = func(*args, **kwargs)
+                return func(*args, **kwargs)
             except Exception:
-                if err_counter is not None:
-                    try:
-                        err_counter.labels(service=service.name, method=method_name).inc()
-                    except Exception as _e:
-                        print(f"[metrics_aspect] failed to inc err_counter for {service.name}.{method_name}: {_e}")
+                err_inc()
                 raise
             finally:
-                elapsed = time.time() - start
-                if req_counter is not None:
-                    try:
-                        req_counter.labels(service=service.name, method=method_name).inc()
-                    except Exception as _e:
-                        print(f"[metrics_aspect] failed to inc req_counter for {service.name}.{method_name}: {_e}")
-                if latency_hist is not None:
-                    try:
-                        latency_hist.labels(service=service.name, method=method_name).observe(elapsed)
-                    except Exception as _e:
-                        print(f"[metrics_aspect] failed to observe latency for {service.name}.{method_name}: {_e}")
-            return result
+                observe(perf_counter() - start)
+                req_inc()
 
+        # only what stacked aspects and tracebacks read; functools.wraps would also copy __dict__
+        wrapper.__name__ = method_name
+        wrapper.__qualname__ = getattr(func, "__qualname__", method_name)
+        wrapper.__wrapped__ = func
         return wrapper
 
     def apply_to_public_methods(
@@ -72,18 +100,5 @@ class MetricsAspect:
         include: Optional[list[str]] = None,
         exclude: Optional[list[str]] = None,
     ) -> None:
-        exclude = set(exclude or [])
-        for attr in dir(obj):
-            if attr.startswith("_"):
-                continue
-            if include is not None and attr not in include:
-                continue
-            if attr in exclude:
-                continue
-            try:
-                val = getattr(obj, attr)
-            except Exception:
-                continue
-            if callable(val):
-                wrapped = self.apply(val, obj)
-                setattr(obj, attr, wrapped)
+        for attr, val in iter_public_methods(obj, include, exclude):
+            setattr(obj, attr, self.apply(val, obj))
@@ -13,9 +13,15 @@ The aspect skips parameters named 'self'.
 """
 from __future__ import annotations
 
-import functools
 import inspect
-from typing import get_origin, get_args, Union
+from typing import Any, Callable, get_origin, get_args, Union
+
+from aop.methods import iter_public_methods
+
+_MISSING = object()
+_POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+_VARIADIC = (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+_CONTAINERS = (list, tuple, dict, set, frozenset)
 
 
 class ValidationAspect:
@@ -28,78 +34,111 @@ class ValidationAspect:
         except Exception:
             return str(t)
 
-    def _match_type(self, expected: object, value: object) -> bool:
+    def _union_types(self, expected: object) -> tuple | None:
+        """Flatten a Union into the types isinstance should accept, or None if any option is unchecked."""
+        accepted = []
+        for arg in get_args(expected):
+            if arg is None:
+                arg = type(None)
+            origin = get_origin(arg)
+            if origin is Union:
+                nested = self._union_types(arg)
+                if nested is None:
+                    return None
+                accepted.extend(nested)
+            elif isinstance(arg, type):
+                accepted.append(arg)
+            elif origin in _CONTAINERS:
+                accepted.append(origin)
+            else:
+                # an option we cannot check accepts anything, so the whole Union does
+                return None
+        return tuple(accepted)
+
+    def _compile_checker(self, expected: object) -> Callable[[Any], bool] | None:
+        """Build a predicate for one annotation; None means the value is not checked."""
         origin = get_origin(expected)
         if origin is Union:
-            # Union[...] or Optional[...] - accept if any option matches
-            for arg in get_args(expected):
-                try:
-                    if self._match_type(arg, value):
-                        return True
-                except Exception:
-                    continue
-            return False
+            # Union[...] or Optional[...] - one isinstance call against every option
+            accepted = self._union_types(expected)
+            if accepted is None:
+                return None
+            return lambda v, _t=accepted: isinstance(v, _t)
 
         # If expected is a plain type
         if isinstance(expected, type):
-            return isinstance(value, expected)
+            return lambda v, _t=expected: isinstance(v, _t)
 
         # If annotation is a typing container like list[int], just check origin
-        if origin in (list, tuple, dict, set):
-            return isinstance(value, origin)
+        if origin in _CONTAINERS:
+            return lambda v, _t=origin: isinstance(v, _t)
 
         # Unknown/complex annotation - be conservative and accept (no strict check)
-        return True
+        return None
 
-    def _validate_call(self, func, bound_args: inspect.BoundArguments) -> None:
-        annotations = getattr(func, "__annotations__", {}) or {}
-        # BoundArguments stores values in the .arguments mapping
-        for name, value in bound_args.arguments.items():
-            if name == "self":
-                continue
-            if name in annotations:
-                expected = annotations[name]
-                try:
-                    ok = self._match_type(expected, value)
-                except Exception:
-                    ok = False
-                if not ok:
-                    raise TypeError(
-                        f"Argument '{name}' to {func.__name__} expected {self._type_name(expected)}, got {type(value).__name__}"
-                    )
+    def _fail(self, func, name: str, expected: object, value: object) -> None:
+        raise TypeError(
+            f"Argument '{name}' to {func.__name__} expected {self._type_name(expected)}, got {type(value).__name__}"
+        )
 
     def apply(self, func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
+        # read annotations from the innermost callable: other aspects' wrappers don't copy them
+        annotations = getattr(inspect.unwrap(func), "__annotations__", {}) or {}
+        if not any(name not in ("self", "return") for name in annotations):
+            # nothing to validate: hand back the method itself, with no wrapper and no signature
+            return func
+        # Everything derived from the signature is resolved once here, not per call
+        try:
             sig = inspect.signature(func)
-            try:
-                bound = sig.bind_partial(*args, **kwargs)
-            except TypeError:
-                # Let underlying function raise for missing required args.
+        except (TypeError, ValueError):
+            return func
+        params = list(sig.parameters.values())
+        n_positional = sum(p.kind in _POSITIONAL for p in params)
+        # (index or None for keyword-only, name, annotation, checker) for every checked parameter
+        checked = []
+        for i, p in enumerate(params):
+            if p.name not in annotations or p.name == "self" or p.kind in _VARIADIC:
+                continue
+            checker = self._compile_checker(annotations[p.name])
+            if checker is not None:
+                checked.append((i if p.kind in _POSITIONAL else None, p.name, annotations[p.name], checker))
+        if not checked:
+            return func
+
+        def wrapper(*args, **kwargs):
+            if len(args) > n_positional:
+                # extra positionals (*args): take the full binding path
+                try:
+                    bound = sig.bind_partial(*args, **kwargs)
+                except TypeError:
+                    # Let underlying function raise for missing required args.
+                    return func(*args, **kwargs)
+                arguments = bound.arguments
+                for _, name, expected, checker in checked:
+                    if name in arguments and not checker(arguments[name]):
+                        self._fail(func, name, expected, arguments[name])
                 return func(*args, **kwargs)
-            # bound.arguments is an ordered mapping name->value
-            self._validate_call(func, bound)
+            n_args = len(args)
+            for i, name, expected, checker in checked:
+                if i is not None and i < n_args:
+                    value = args[i]
+                else:
+                    value = kwargs.get(name, _MISSING)
+                    if value is _MISSING:
+                        continue
+                if not checker(value):
+                    self._fail(func, name, expected, value)
             return func(*args, **kwargs)
 
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = getattr(func, "__qualname__", func.__name__)
+        wrapper.__wrapped__ = func
         return wrapper
 
     def apply_to_public_methods(self, obj, include: list[str] | None = None, exclude: list[str] | None = None) -> None:
-        exclude_set = set(exclude or [])
-        for attr in dir(obj):
-            if attr.startswith("_"):
-                continue
-            if include is not None and attr not in include:
-                continue
-            if attr in exclude_set:
-                continue
+        for attr, val in iter_public_methods(obj, include, exclude):
             try:
-                val = getattr(obj, attr)
+                setattr(obj, attr, self.apply(val))
             except Exception:
+                # skip wrapping if anything about the attribute prevents it
                 continue
-            if callable(val):
-                try:
-                    wrapped = self.apply(val)
-                    setattr(obj, attr, wrapped)
-                except Exception:
-                    # skip wrapping if anything about the attribute prevents it
-                    continue
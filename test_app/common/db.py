@@ -2,15 +2,43 @@
 
 Relies on DATABASE_URL from environment (loaded via common.env).
 Uses pg8000 under the hood and provides a context-managed connection.
+When psycopg 3 is installed (``psycopg[binary]``/``psycopg[c]``) it is used
+instead: its protocol handling and row decoding run in C rather than Python.
+Connections are pooled per DSN and handed out most-recently-used first, so a
+request reuses an already authenticated session (and pg8000's per-connection
+prepared statement cache) instead of paying the connect handshake.
 """
 from __future__ import annotations
 
+import atexit
 import os
+import queue
+import re
+import threading
+import time
+import weakref
 from contextlib import contextmanager
 from urllib.parse import urlparse
 
 import pg8000
 
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+
+# idle connections kept per DSN; bursts above this open extra ones that are closed on release
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+# idle connections older than this are closed instead of reused (server/proxy idle timeouts)
+MAX_INACTIVE_SEC = 300.0
+
+_pools: dict[str, queue.LifoQueue] = {}
+_pools_lock = threading.Lock()
+# per-connection server-side prepared statements, keyed by SQL text
+_statements: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+# pg8000 named parameter (:name, but not a ::cast)
+_NAMED_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+
 
 def _parse_dsn(dsn: str) -> dict:
     """Parse a PostgreSQL DSN into pg8000 connect kwargs."""
@@ -35,20 +63,128 @@ def _parse_dsn(dsn: str) -> dict:
     }
 
 
+def _connect(dsn: str):
+    if psycopg is not None:
+        # libpq reads the URL (and PG* fallbacks) itself
+        return psycopg.connect(dsn)
+    return pg8000.connect(**_parse_dsn(dsn))
+
+
+def _in_transaction(conn) -> bool:
+    if psycopg is not None and isinstance(conn, psycopg.Connection):
+        return conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE
+    return getattr(conn, "_in_transaction", True)
+
+
+def _pool(dsn: str) -> queue.LifoQueue:
+    pool = _pools.get(dsn)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(dsn, queue.LifoQueue(maxsize=POOL_SIZE))
+    return pool
+
+
+def _close(conn) -> None:
+    # cached statements reference their connection, so the weak key alone never frees it
+    _statements.pop(conn, None)
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _acquire(dsn: str, pool: queue.LifoQueue):
+    now = time.monotonic()
+    while True:
+        try:
+            conn, released_at = pool.get_nowait()
+        except queue.Empty:
+            return _connect(dsn)
+        if now - released_at < MAX_INACTIVE_SEC:
+            return conn
+        _close(conn)
+
+
+def _release(pool: queue.LifoQueue, conn, failed: bool = False) -> None:
+    try:
+        # don't hand an open transaction (or its snapshot) to the next caller; after a
+        # failure always round-trip, which also proves the connection is still alive
+        if failed or _in_transaction(conn):
+            conn.rollback()
+        pool.put_nowait((conn, time.monotonic()))
+    except Exception:
+        # pool full or connection broken
+        _close(conn)
+
+
+@atexit.register
+def close_pools() -> None:
+    """Close every idle pooled connection (runs at interpreter exit)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        while True:
+            try:
+                conn, _ = pool.get_nowait()
+            except queue.Empty:
+                break
+            _close(conn)
+
+
 @contextmanager
 def get_conn():
     dsn = os.getenv("DATABASE_URL")
     if not dsn:
         raise RuntimeError("DATABASE_URL is not set in environment")
-    kwargs = _parse_dsn(dsn)
-    conn = pg8000.connect(**kwargs)
+    pool = _pool(dsn)
+    conn = _acquire(dsn, pool)
     try:
         yield conn
         # pg8000 is autocommit=False by default; callers commit when needed
-    finally:
-        conn.close()
+    except Exception:
+        # rolled back and reused, unless the connection itself is what broke
+        _release(pool, conn, failed=True)
+        raise
+    except BaseException:
+        _close(conn)
+        raise
+    _release(pool, conn)
+
+
+def prepared(conn, sql: str):
+    """Return a statement prepared once per pooled connection for ``sql``.
+
+    ``sql`` uses pg8000's named parameters (``:name``); call ``.run(name=...)`` on
+    the result to execute it and get the rows back. Postgres parses and plans the
+    statement on first use only.
+    """
+    stmts = _statements.get(conn)
+    if stmts is None:
+        stmts = _statements[conn] = {}
+    stmt = stmts.get(sql)
+    if stmt is None:
+        if psycopg is not None and isinstance(conn, psycopg.Connection):
+            stmt = _PsycopgStatement(conn, sql)
+        else:
+            stmt = conn.prepare(sql)
+        stmts[sql] = stmt
+    return stmt
+
+
+class _PsycopgStatement:
+    """pg8000 PreparedStatement look-alike for psycopg connections."""
+
+    def __init__(self, conn, sql: str):
+        self._conn = conn
+        self._sql = _NAMED_PARAM.sub(r"%(\1)s", sql)
+
+    def run(self, **vals) -> tuple:
+        with self._conn.cursor() as cur:
+            # prepare=True: server-side prepared from the first execution, not the fifth
+            cur.execute(self._sql, vals, prepare=True)
+            return tuple(cur.fetchall()) if cur.description else ()
 
 
 def db_available() -> bool:
-    """Return True if DATABASE_URL is set (driver is pure Python)."""
+    """Return True if DATABASE_URL is set (pg8000 is always installed as the fallback driver)."""
     return bool(os.getenv("DATABASE_URL"))
@@ -2,9 +2,33 @@
 
 Import this module as early as possible in entry points to load variables from a .env file.
 Does not override variables already present in the environment.
+
+The resolved .env path is recorded in ``_ENV_LOADED_PATH``; child processes (Flask
+reloader, workers, load generators) inherit both it and the loaded variables, so
+they skip the upward directory walk.
 """
 from __future__ import annotations
 
+import functools
+import os
+
 from dotenv import load_dotenv, find_dotenv
 
-load_dotenv(find_dotenv(usecwd=True), override=False)
+_LOADED_PATH_VAR = "_ENV_LOADED_PATH"
+
+
+@functools.lru_cache(maxsize=None)
+def load() -> str:
+    """Load the nearest .env once per process tree; return its path ('' if none)."""
+    path = os.environ.get(_LOADED_PATH_VAR)
+    if path is not None:
+        # an ancestor process already loaded it into the environment we inherited
+        return path
+    path = find_dotenv(usecwd=True)
+    if path:
+        load_dotenv(path, override=False)
+    os.environ[_LOADED_PATH_VAR] = path
+    return path
+
+
+load()
@@ -0,0 +1,72 @@
+"""orjson-backed JSON for the Flask apps.
+
+``install(app)`` swaps the app's JSON provider so ``jsonify``/``request.get_json``
+serialize in orjson (Rust) instead of the stdlib encoder. Output matches Flask's
+default compact form (sorted keys, trailing newline); debug-mode pretty printing
+and any call with explicit json.dumps kwargs fall back to the stdlib path. Without
+orjson installed, ``install`` leaves Flask's default provider in place.
+
+``conditional_json`` is for payloads that pollers re-fetch unchanged (``/health``,
+``/info``): the response carries an ETag and a matching ``If-None-Match`` gets an
+empty 304 instead of the body. The ETag leaves out the fields that tick with time
+or traffic (``uptime_sec``, ``calls`` and ``*_ts``), so a 304 means nothing else
+has changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import typing as t
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def _options(self) -> int:
+        opts = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        return opts
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s: str | bytes, **kwargs: t.Any) -> t.Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install(app) -> None:
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+_VOLATILE_FIELDS = frozenset({"uptime_sec", "calls"})
+
+
+def _etag_fields(payload: t.Any) -> t.Any:
+    if not isinstance(payload, dict):
+        return payload
+    return {k: v for k, v in payload.items() if k not in _VOLATILE_FIELDS and not k.endswith("_ts")}
+
+
+def conditional_json(payload: t.Any):
+    resp = current_app.json.response(payload)
+    stable = current_app.json.dumps(_etag_fields(payload)).encode()
+    resp.set_etag(hashlib.sha1(stable).hexdigest())
+    return resp.make_conditional(request)
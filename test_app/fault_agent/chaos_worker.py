@@ -0,0 +1,163 @@
+"""Long-lived fault worker that runs inside a target container.
+
+chaos_agent copies this file into each target once (``docker cp``) and starts it
+with ``docker exec -d``, so repeated faults do not pay interpreter start-up and
+source compilation on every injection. Commands arrive as JSON lines on a named
+pipe, which the agent can write to with a plain ``sh`` (no ``nc`` needed in slim
+images):
+
+    {"op": "cpu", "secs": 25}
+    {"op": "mem", "mb": 1024, "secs": 25}
+    {"op": "disk", "mb": 100, "secs": 10}
+    {"op": "iptables_drop", "port": 5000, "secs": 15}
+
+Each command runs on its own thread so a long hog does not block the next one.
+A command that cannot be parsed or whose op raises is logged as a JSON line to
+stderr and appended to ``STATUS_PATH``; the agent drains that file on its next
+send, since the FIFO write itself only confirms delivery. Only the standard
+library is used.
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+import stat
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict
+
+FIFO_PATH = "/tmp/chaos_worker.fifo"
+PID_PATH = "/tmp/chaos_worker.pid"
+DISK_PATH = "/tmp/chaos_bloat.dat"
+STATUS_PATH = "/tmp/chaos_worker.status"
+
+
+def burn_cpu(secs: float) -> None:
+    t = time.monotonic() + secs
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        # one BLAS call per loop iteration: the core does real FPU work, not bytecode dispatch
+        a = np.random.rand(1 << 20)
+        while time.monotonic() < t:
+            np.dot(a, a)
+        return
+    x = 0.0
+    while time.monotonic() < t:
+        x += math.sqrt(123456)
+
+
+def hold_memory(mb: int, secs: float) -> None:
+    a = [bytearray(1024 * 1024) for _ in range(mb)]
+    time.sleep(secs)
+    del a
+
+
+def fill_disk(mb: int, secs: float) -> None:
+    chunk = b"0" * 1024 * 1024
+    try:
+        with open(DISK_PATH, "wb") as f:
+            for _ in range(mb):
+                f.write(chunk)
+        time.sleep(secs)
+    finally:
+        try:
+            os.remove(DISK_PATH)
+        except OSError:
+            pass
+
+
+def drop_port(port: int, secs: float) -> None:
+    rule = ["INPUT", "-p", "tcp", "--dport", str(port), "-j", "DROP"]
+    # check=True: a missing iptables or NET_ADMIN surfaces through _run_op, and the
+    # delete only runs once the insert has succeeded
+    _iptables(["-I"] + rule)
+    try:
+        time.sleep(secs)
+    finally:
+        _iptables(["-D"] + rule)
+
+
+def _iptables(args: list[str]) -> None:
+    try:
+        subprocess.run(["iptables"] + args, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"iptables {' '.join(args)}: {e.stderr.strip() or f'exit {e.returncode}'}") from e
+
+
+OPS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "cpu": lambda m: burn_cpu(float(m.get("secs", 30))),
+    "mem": lambda m: hold_memory(int(m.get("mb", 128)), float(m.get("secs", 30))),
+    "disk": lambda m: fill_disk(int(m.get("mb", 100)), float(m.get("secs", 10))),
+    "iptables_drop": lambda m: drop_port(int(m["port"]), float(m.get("secs", 15))),
+}
+
+
+def _report_failure(msg: Any, exc: BaseException) -> None:
+    op = msg.get("op") if isinstance(msg, dict) else None
+    line = json.dumps({"ts": time.time(), "op": op, "error": f"{type(exc).__name__}: {exc}"})
+    print(line, file=sys.stderr, flush=True)
+    try:
+        with open(STATUS_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        pass
+
+
+def _run_op(op: Callable[[Dict[str, Any]], None], msg: Dict[str, Any]) -> None:
+    try:
+        op(msg)
+    except Exception as e:
+        _report_failure(msg, e)
+
+
+def handle(line: str) -> None:
+    msg: Any = None
+    try:
+        msg = json.loads(line)
+        op = OPS[msg["op"]]
+    except Exception as e:
+        _report_failure(msg, e)
+        return
+    threading.Thread(target=_run_op, args=(op, msg), daemon=True).start()
+
+
+def _already_running() -> bool:
+    try:
+        with open(PID_PATH) as f:
+            pid = int(f.read().strip())
+        if pid == os.getpid():
+            return False
+        # /tmp outlives `docker restart`, so the recorded pid may now belong to another
+        # process (often a gunicorn worker); only a chaos_worker.py command line counts
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return b"chaos_worker.py" in f.read()
+    except (OSError, ValueError):
+        return False
+
+
+def main() -> None:
+    if _already_running():
+        return
+    try:
+        if not stat.S_ISFIFO(os.stat(FIFO_PATH).st_mode):
+            os.remove(FIFO_PATH)
+            os.mkfifo(FIFO_PATH)
+    except FileNotFoundError:
+        os.mkfifo(FIFO_PATH)
+    with open(PID_PATH, "w") as f:
+        f.write(str(os.getpid()))
+    while True:
+        # open() blocks until a writer connects; EOF means the writer is done
+        with open(FIFO_PATH, encoding="utf-8") as fifo:
+            for line in fifo:
+                handle(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,24 @@
 import argparse
 import asyncio
+import bisect
 import itertools
-import math
 import random
-import time
-from typing import List
+from typing import List, Optional, Tuple
 
 import aiohttp
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
 async def do_checkout(session: aiohttp.ClientSession, host: str, port: int, user: str, product_id: int):
     base = f"http://{host}:{port}"
     try:
-        await session.post(f"{base}/cart/{user}/add", json={"product_id": product_id}, timeout=5)
+        # read the add response so its connection goes back to the pool before checkout
+        async with session.post(f"{base}/cart/{user}/add", json={"product_id": product_id}, timeout=5) as resp:
+            await resp.read()
         async with session.post(f"{base}/cart/{user}/checkout", timeout=10) as resp:
             text = await resp.text()
             return resp.status, text
@@ -20,59 +26,153 @@ async def do_checkout(session: aiohttp.ClientSession, host: str, port: int, user
         return None, str(e)
 
 
-def rps_for_time(t: float, burst_duration: float, base_rps: float, peak_rps: float, decay_power: float) -> float:
-    frac = min(max(t / burst_duration, 0.0), 1.0)
-    return base_rps + (peak_rps - base_rps) * (1 - frac ** decay_power)
+class InFlight:
+    """Caps concurrent checkouts and keeps a reference to each running task.
+
+    fire() waits for a free slot before creating the task, so a slow server
+    throttles the generator instead of piling up tasks, sockets and responses.
+    Finished tasks drop out of the set on their own; their outcome is tallied
+    so failures are reported rather than dropped.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self._sem = asyncio.Semaphore(max_in_flight)
+        self._tasks = set()
+        self.ok = 0
+        self.failed = 0
+
+    async def _run(self, coro):
+        try:
+            status, _ = await coro
+        finally:
+            self._sem.release()
+        if status is not None and status < 400:
+            self.ok += 1
+        else:
+            self.failed += 1
+
+    async def drain(self) -> Tuple[int, int]:
+        """Wait for every outstanding checkout; return and reset the (ok, failed) tally."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        counts = (self.ok, self.failed)
+        self.ok = self.failed = 0
+        return counts
+
+    async def fire(self, coro):
+        await self._sem.acquire()
+        task = asyncio.create_task(self._run(coro))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def make_session(max_in_flight: int) -> aiohttp.ClientSession:
+    # the default connector limit (100) would silently serialise bursts above 100 in flight
+    connector = aiohttp.TCPConnector(limit=max_in_flight, ttl_dns_cache=300, enable_cleanup_closed=True)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=15))
+
+
+def requests_by_time(t: float, burst_duration: float, base_rps: float, peak_rps: float, decay_power: float) -> float:
+    """Requests due by t seconds into a burst.
+
+    The rate decays from peak_rps to base_rps as base + (peak - base) * (1 - (t/T)**p);
+    this is its integral from 0 to t.
+    """
+    if burst_duration <= 0:
+        return 0.0
+    t = min(max(t, 0.0), burst_duration)
+    decayed = t ** (decay_power + 1) / ((decay_power + 1) * burst_duration ** decay_power)
+    return base_rps * t + (peak_rps - base_rps) * (t - decayed)
+
+
+def send_schedule(burst_duration: float, base_rps: float, peak_rps: float, decay_power: float,
+                  grid_points: int = 4096) -> List[float]:
+    """Offsets (seconds from burst start) at which the k-th request of a burst is due.
+
+    Inverts requests_by_time on a dense grid with linear interpolation, so a whole
+    burst is planned up front instead of re-deriving the rate before every send.
+    An empty window (burst_duration <= 0) sends nothing.
+    """
+    if burst_duration <= 0:
+        return []
+    grid = [burst_duration * i / grid_points for i in range(grid_points + 1)]
+    counts = [requests_by_time(t, burst_duration, base_rps, peak_rps, decay_power) for t in grid]
+    offsets = []
+    for k in range(1, int(counts[-1]) + 1):
+        i = bisect.bisect_left(counts, k)
+        lo, hi = counts[i - 1], counts[i]
+        frac = (k - lo) / (hi - lo) if hi > lo else 0.0
+        offsets.append(grid[i - 1] + frac * (grid[i] - grid[i - 1]))
+    return offsets
+
+
+def build_schedule(burst_duration: float, base_rps: float, peak_rps: float, decay_power: float,
+                   jitter_sigma: float = 0.1, seed: Optional[int] = None) -> List[float]:
+    """send_schedule with each deadline jittered by jitter_sigma of its gap.
+
+    The result is sorted and clamped to the burst window, so the send loop only
+    has to walk it. A seed makes a burst reproducible.
+    """
+    rng = random.Random(seed)
+    gauss = rng.gauss
+    jittered = []
+    prev = 0.0
+    for offset in send_schedule(burst_duration, base_rps, peak_rps, decay_power):
+        jittered.append(min(max(offset + gauss(0.0, (offset - prev) * jitter_sigma), 0.0), burst_duration))
+        prev = offset
+    jittered.sort()
+    return jittered
 
 
 async def burst_loop(host: str, port: int, users: List[str], product_id: int,
                      burst_interval: float, burst_duration: float,
-                     peak_rps: float, base_rps: float, decay_power: float):
+                     peak_rps: float, base_rps: float, decay_power: float,
+                     max_in_flight: int = 500):
     user_cycle = itertools.cycle(users)
-    async with aiohttp.ClientSession() as session:
-        next_burst = time.time()
+    in_flight = InFlight(max_in_flight)
+    loop = asyncio.get_running_loop()
+    async with make_session(max_in_flight) as session:
+        next_burst = loop.time()
         while True:
-            now = time.time()
-            sleep_for = max(0, next_burst - now)
+            sleep_for = next_burst - loop.time()
             if sleep_for > 0:
                 await asyncio.sleep(sleep_for)
 
-            start = time.time()
-            end = start + burst_duration
-            t = 0.0
-            last_sent = time.time()
+            # +-10% jitter on each gap keeps arrivals from being perfectly regular
+            schedule = build_schedule(burst_duration, base_rps, peak_rps, decay_power)
+            start = loop.time()
             sent = 0
-            while time.time() < end:
-                t = time.time() - start
-                target_rps = rps_for_time(t, burst_duration, base_rps, peak_rps, decay_power)
-                if target_rps <= 0:
-                    await asyncio.sleep(1)
-                    continue
-
-                interval = 1.0 / target_rps
-                interval = max(0.001, random.gauss(interval, interval * 0.1))
+            for offset in schedule:
+                delay = start + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
                 user = next(user_cycle)
-                asyncio.create_task(do_checkout(session, host, port, user, product_id))
+                await in_flight.fire(do_checkout(session, host, port, user, product_id))
                 sent += 1
-                await asyncio.sleep(interval)
 
-            print(f"Burst finished: sent ~{sent} events")
-            next_burst = time.time() + burst_interval
+            # the burst window lasts burst_duration even if its last request was due earlier
+            sleep_for = start + burst_duration - loop.time()
+            if sleep_for > 0:
+                await asyncio.sleep(sleep_for)
+            ok, failed = await in_flight.drain()
+            print(f"Burst finished: sent ~{sent} events ({ok} ok, {failed} failed)")
+            next_burst = loop.time() + burst_interval
 
 
 async def pattern_loop(host: str, port: int, users: List[str], product_id: int,
                        burst_requests: int, burst_duration: float,
                        followup_requests: int, followup_duration: float,
-                       cycle_interval: float):
+                       cycle_interval: float, max_in_flight: int = 500):
     user_cycle = itertools.cycle(users)
-    async with aiohttp.ClientSession() as session:
+    in_flight = InFlight(max_in_flight)
+    async with make_session(max_in_flight) as session:
         while True:
             if burst_requests > 0 and burst_duration > 0:
                 interval = burst_duration / float(burst_requests)
                 sent = 0
                 for _ in range(burst_requests):
                     user = next(user_cycle)
-                    asyncio.create_task(do_checkout(session, host, port, user, product_id))
+                    await in_flight.fire(do_checkout(session, host, port, user, product_id))
                     sent += 1
                     await asyncio.sleep(max(0.001, random.gauss(interval, interval * 0.05)))
                 print(f"Pattern burst finished: sent {sent} events over {burst_duration}s")
@@ -82,11 +182,14 @@ async def pattern_loop(host: str, port: int, users: List[str], product_id: int,
                 sent2 = 0
                 for _ in range(followup_requests):
                     user = next(user_cycle)
-                    asyncio.create_task(do_checkout(session, host, port, user, product_id))
+                    await in_flight.fire(do_checkout(session, host, port, user, product_id))
                     sent2 += 1
                     await asyncio.sleep(max(0.001, random.gauss(interval, interval * 0.05)))
                 print(f"Pattern follow-up finished: sent {sent2} events over {followup_duration}s")
 
+            ok, failed = await in_flight.drain()
+            print(f"Pattern cycle settled: {ok} ok, {failed} failed")
+
             if cycle_interval and cycle_interval > 0:
                 await asyncio.sleep(cycle_interval)
 
@@ -113,10 +216,14 @@ def main():
     p.add_argument("--burst-requests", type=int, default=0, help="Number of requests to send during the primary burst window")
     p.add_argument("--followup-requests", type=int, default=0, help="Number of requests to send during the follow-up window")
     p.add_argument("--followup-duration", type=float, default=60.0, help="Seconds for the follow-up window (default 60s)")
+    p.add_argument("--max-in-flight", type=int, default=500, help="Maximum concurrent checkouts; sending pauses while this many are outstanding")
     p.add_argument("--cycle-interval", type=float, default=0.0, help="Seconds to wait after a full pattern cycle before starting the next; 0 repeats immediately")
     args = p.parse_args()
 
     users = parse_users(args.users)
+    if uvloop is not None:
+        # libuv-based loop: less per-request scheduling overhead in the generator itself
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
     print(f"Simulating checkouts to http://{args.host}:{args.port}/ - users={len(users)}")
     try:
@@ -131,11 +238,13 @@ def main():
                 args.followup_requests,
                 args.followup_duration,
                 args.cycle_interval,
+                args.max_in_flight,
             ))
         else:
             asyncio.run(burst_loop(args.host, args.port, users, args.product_id,
                                    args.burst_interval, args.burst_duration,
-                                   args.peak_rps, args.base_rps, args.decay_power))
+                                   args.peak_rps, args.base_rps, args.decay_power,
+                                   args.max_in_flight))
     except KeyboardInterrupt:
         print("Stopped by user")
 
@@ -0,0 +1,6 @@
+"""WSGI entry point: ``gunicorn microservices.cart.wsgi:application``."""
+from microservices.cart.app import CartApp
+
+cart_app = CartApp()
+cart_app.setup_routes()
+application = cart_app.app
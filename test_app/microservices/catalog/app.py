@@ -3,29 +3,31 @@ from microservices.catalog.catalog_service import CatalogService
 from aop.logging_aspect import LoggingAspect
 from aop.health_info_aspect import HealthInfoAspect
 from aop.metrics_aspect import MetricsAspect
+from aop.composite_aspect import CompositeAspect
+from common.json_provider import conditional_json, install as install_json
 
 class CatalogApp:
     def __init__(self):
         self.app = Flask(__name__)
+        install_json(self.app)
         self.service = CatalogService("catalog", 5001)
         self.aspect = LoggingAspect()
-        self.aspect.apply_to_public_methods(
-            self.service,
-            include=["list_items", "get_item"],
-        )
+        # Metrics aspect: record latency and request counts
         self.metrics_aspect = MetricsAspect()
-        self.metrics_aspect.apply_to_public_methods(
+        # Health/Info aspect
+        self.health = HealthInfoAspect(self.service, version="1.0.0")
+        # all three run inside one wrapper per method instead of three stacked ones
+        CompositeAspect([self.aspect, self.metrics_aspect, self.health]).apply_to_public_methods(
             self.service,
             include=["list_items", "get_item"],
         )
-        self.health = HealthInfoAspect(self.service, version="1.0.0")
-        self.health.apply_to_public_methods(self.service, include=["list_items", "get_item"])
 
     def setup_routes(self):
         @self.app.route("/items", methods=["GET"])
         def get_items():
-            items = self.service.list_items()
-            return jsonify(items), 200
+            if self.service.items_json is not None:
+                return self.app.response_class(self.service.items_json, mimetype="application/json"), 200
+            return jsonify(self.service.list_items()), 200
 
         @self.app.route("/items/<int:item_id>", methods=["GET"])
         def get_item(item_id):
@@ -42,11 +44,11 @@ class CatalogApp:
 
         @self.app.route("/health", methods=["GET"])
         def health_check():
-            return jsonify(self.health.get_health()), 200
+            return conditional_json(self.health.get_health())
 
         @self.app.route("/info", methods=["GET"])
         def info():
-            return jsonify(self.health.get_info()), 200
+            return conditional_json(self.health.get_info())
 
     def start(self):
         self.app.run(host="0.0.0.0", port=5001)
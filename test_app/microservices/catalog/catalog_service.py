@@ -1,6 +1,12 @@
+import json
+
 from microservices.base_service import BaseService
 from common import env as _env  # noqa: F401
-from common.db import db_available
+from common.db import db_available, get_conn, prepared
+
+# price is numeric in the schema; float8 in SQL so rows arrive as floats, not Decimals
+SQL_LIST_PRODUCTS = "SELECT id, name, price::float8 FROM products ORDER BY id;"
+SQL_GET_PRODUCT = "SELECT id, name, price::float8 FROM products WHERE id=:item_id;"
 
 
 class CatalogService(BaseService):
@@ -12,33 +18,32 @@ class CatalogService(BaseService):
             {"id": 2, "name": "Gadget", "price": 14.99},
             {"id": 3, "name": "Doohickey", "price": 4.99},
         ]
+        self._by_id = {item["id"]: item for item in self._items}
+        # the fallback catalog never changes, so GET /items can send these bytes as-is;
+        # None when the catalog is read from the DB. Same compact, sorted form as jsonify.
+        self.items_json = None if self._use_db else (
+            json.dumps(self._items, separators=(",", ":"), sort_keys=True).encode() + b"\n"
+        )
 
     def list_items(self) -> list:
         """Return all catalog items from DB if available, else fallback."""
         if self._use_db:
-            from common.db import get_conn
-
             with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT id, name, price FROM products ORDER BY id;")
-                    rows = cur.fetchall()
-            return [{"id": r[0], "name": r[1], "price": float(r[2])} for r in rows]
+                rows = prepared(conn, SQL_LIST_PRODUCTS).run()
+            return [{"id": r[0], "name": r[1], "price": r[2]} for r in rows]
         return list(self._items)
 
     def get_item(self, item_id: int) -> dict:
         """Return an item by id or raise KeyError if not found."""
         if self._use_db:
-            from common.db import get_conn
-
             with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT id, name, price FROM products WHERE id=%s;", (item_id,))
-                    row = cur.fetchone()
-            if not row:
+                rows = prepared(conn, SQL_GET_PRODUCT).run(item_id=item_id)
+            if not rows:
                 raise KeyError(f"Item with id {item_id} not found")
-            return {"id": row[0], "name": row[1], "price": float(row[2])}
+            row = rows[0]
+            return {"id": row[0], "name": row[1], "price": row[2]}
 
-        for item in self._items:
-            if item["id"] == item_id:
-                return item
-        raise KeyError(f"Item with id {item_id} not found")
+        try:
+            return self._by_id[item_id]
+        except KeyError:
+            raise KeyError(f"Item with id {item_id} not found") from None
@@ -0,0 +1,6 @@
+"""WSGI entry point: ``gunicorn microservices.catalog.wsgi:application``."""
+from microservices.catalog.app import CatalogApp
+
+catalog_app = CatalogApp()
+catalog_app.setup_routes()
+application = catalog_app.app
@@ -4,38 +4,56 @@ from microservices.cart.cart_service import CartService
 from microservices.payment.payment_service import PaymentService
 
 
+# Downstream services are shared by every gateway in the process, so each is built
+# (metrics registry, DB probe) once rather than per GatewayService instance.
+_SERVICES: dict = {}
+
+
+def _shared(cls, name: str, port: int):
+    svc = _SERVICES.get(name)
+    if svc is None:
+        svc = _SERVICES[name] = cls(name, port)
+    return svc
+
+
+def _cart_add(gw, payload: dict):
+    item_id = payload["item_id"]
+    user_id = payload["user_id"]
+    # Ensure product exists first
+    _ = gw.catalog.get_item(item_id)
+    return {"ok": True} if gw.cart.add_to_cart(user_id, item_id) else {"ok": False}
+
+
+def _checkout_and_pay(gw, payload: dict):
+    user_id = payload["user_id"]
+    result = gw.cart.checkout(user_id)
+    gw.payment.process_payment(user_id, result["total_amount"])  # mark paid
+    result["status"] = "paid"
+    return result
+
+
+# (service, endpoint) -> handler(gateway, payload); one dict lookup per request
+_ROUTES = {
+    ("catalog", "list_items"): lambda gw, payload: gw.catalog.list_items(),
+    ("catalog", "get_item"): lambda gw, payload: gw.catalog.get_item(payload["item_id"]),  # may raise KeyError
+    ("cart", "add"): _cart_add,
+    ("order", "checkout"): lambda gw, payload: gw.cart.checkout(payload["user_id"]),
+    ("order", "checkout_and_pay"): _checkout_and_pay,
+}
+
+
 class GatewayService(BaseService):
     def __init__(self, name: str, port: int):
         super().__init__(name, port)
-        self.catalog = CatalogService("catalog", 5001)
-        self.cart = CartService("cart", 5002)
-        self.payment = PaymentService("payment", 5003)
+        self.catalog = _shared(CatalogService, "catalog", 5001)
+        self.cart = _shared(CartService, "cart", 5002)
+        self.payment = _shared(PaymentService, "payment", 5003)
 
     def route_request(self, service_name: str, endpoint: str, payload: dict):
-        if service_name == "catalog" and endpoint == "list_items":
-            return self.catalog.list_items()
-        if service_name == "catalog" and endpoint == "get_item":
-            return self.catalog.get_item(payload["item_id"])  # may raise KeyError
-
-        if service_name == "cart" and endpoint == "add":
-            item_id = payload["item_id"]
-            user_id = payload["user_id"]
-            # Ensure product exists first
-            _ = self.catalog.get_item(item_id)
-            return {"ok": True} if self.cart.add_to_cart(user_id, item_id) else {"ok": False}
-
-        if service_name == "order" and endpoint == "checkout":
-            user_id = payload["user_id"]
-            return self.cart.checkout(user_id)
-
-        if service_name == "order" and endpoint == "checkout_and_pay":
-            user_id = payload["user_id"]
-            result = self.cart.checkout(user_id)
-            self.payment.process_payment(user_id, result["total_amount"])  # mark paid
-            result["status"] = "paid"
-            return result
-
-        raise ValueError("Unknown route")
+        handler = _ROUTES.get((service_name, endpoint))
+        if handler is None:
+            raise ValueError("Unknown route")
+        return handler(self, payload)
 
     def handle_response(self, response):
         return response
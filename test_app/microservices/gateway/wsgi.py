@@ -0,0 +1,6 @@
+"""WSGI entry point: ``gunicorn microservices.gateway.wsgi:application``."""
+from microservices.gateway.app import GatewayApp
+
+gateway_app = GatewayApp()
+gateway_app.setup_routes()
+application = gateway_app.app
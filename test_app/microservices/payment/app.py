@@ -3,23 +3,24 @@ from microservices.payment.payment_service import PaymentService
 from aop.logging_aspect import LoggingAspect
 from aop.health_info_aspect import HealthInfoAspect
 from aop.metrics_aspect import MetricsAspect
+from aop.composite_aspect import CompositeAspect
+from common.json_provider import conditional_json, install as install_json
 
 class PaymentApp:
     def __init__(self):
         self.app = Flask(__name__)
+        install_json(self.app)
         self.service = PaymentService("payment", 5003)
         self.aspect = LoggingAspect()
-        self.aspect.apply_to_public_methods(
-            self.service,
-            include=["process_payment", "refund_payment"],
-        )
+        # Metrics aspect: record latency and request counts
         self.metrics_aspect = MetricsAspect()
-        self.metrics_aspect.apply_to_public_methods(
+        # Health/Info aspect
+        self.health = HealthInfoAspect(self.service, version="1.0.0")
+        # all three run inside one wrapper per method instead of three stacked ones
+        CompositeAspect([self.aspect, self.metrics_aspect, self.health]).apply_to_public_methods(
             self.service,
             include=["process_payment", "refund_payment"],
         )
-        self.health = HealthInfoAspect(self.service, version="1.0.0")
-        self.health.apply_to_public_methods(self.service, include=["process_payment", "refund_payment"])
 
     def setup_routes(self):
         @self.app.route("/payment/process", methods=["POST"])
@@ -51,11 +52,11 @@ class PaymentApp:
 
         @self.app.route("/health", methods=["GET"])
         def health_check():
-            return jsonify(self.health.get_health()), 200
+            return conditional_json(self.health.get_health())
 
         @self.app.route("/info", methods=["GET"])
         def info():
-            return jsonify(self.health.get_info()), 200
+            return conditional_json(self.health.get_info())
 
     def start(self):
         self.app.run(host="0.0.0.0", port=5003)
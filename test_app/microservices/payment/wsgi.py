@@ -0,0 +1,6 @@
+"""WSGI entry point: ``gunicorn microservices.payment.wsgi:application``."""
+from microservices.payment.app import PaymentApp
+
+payment_app = PaymentApp()
+payment_app.setup_routes()
+application = payment_app.app
@@ -1,3 +1,4 @@
+import time
 from typing import Dict, Any, List, Optional
 
 from prometheus_client import (
@@ -16,8 +17,14 @@ except Exception:
 
 
 class PrometheusExporter:
+    # scrapes closer together than this get the previous payload instead of a new walk
+    # over every collector (process stats read /proc on each collect)
+    CACHE_TTL_SEC = 0.5
+
     def __init__(self, service_name: str):
         self.service_name = service_name
+        self._last_body: Optional[bytes] = None
+        self._last_ts = 0.0
         self.registry = CollectorRegistry()
         if _prom_core is not None:
             try:
@@ -36,22 +43,45 @@ class PrometheusExporter:
 
         self.metrics: Dict[str, Any] = {}
 
-    def create_counter(self, name: str, description: str, label_names: Optional[List[str]] = None) -> Counter:
-        if label_names is None:
-            label_names = ["service"]
-        full_name = f"{self.service_name}_{name}"
-        counter = Counter(full_name, description, label_names, registry=self.registry)
-        self.metrics[name] = counter
-        return counter
-
-    def create_histogram(self, name: str, description: str, label_names: Optional[List[str]] = None) -> Histogram:
-        if label_names is None:
-            label_names = ["service"]
-        full_name = f"{self.service_name}_{name}"
-        histogram = Histogram(full_name, description, label_names, registry=self.registry)
-        self.metrics[name] = histogram
-        return histogram
+    def create_counter(
+        self,
+        name: str,
+        description: str,
+        label_names: Optional[List[str]] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> Counter:
+        """Register (or reuse) a counter family; with ``labels`` return that child, bound once."""
+        # a second aspect (or a second app over the same service) gets the family already
+        # registered, instead of a duplicate-timeseries error that leaves it uninstrumented
+        counter = self.metrics.get(name)
+        if not isinstance(counter, Counter):
+            if label_names is None:
+                label_names = list(labels) if labels else ["service"]
+            full_name = f"{self.service_name}_{name}"
+            counter = Counter(full_name, description, label_names, registry=self.registry)
+            self.metrics[name] = counter
+        return counter.labels(**labels) if labels else counter
+
+    def create_histogram(
+        self,
+        name: str,
+        description: str,
+        label_names: Optional[List[str]] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> Histogram:
+        """Register (or reuse) a histogram family; with ``labels`` return that child, bound once."""
+        histogram = self.metrics.get(name)
+        if not isinstance(histogram, Histogram):
+            if label_names is None:
+                label_names = list(labels) if labels else ["service"]
+            full_name = f"{self.service_name}_{name}"
+            histogram = Histogram(full_name, description, label_names, registry=self.registry)
+            self.metrics[name] = histogram
+        return histogram.labels(**labels) if labels else histogram
 
     def export_metrics(self):
-        data = generate_latest(self.registry)
-        return data, CONTENT_TYPE_LATEST
+        now = time.monotonic()
+        if self._last_body is None or now - self._last_ts >= self.CACHE_TTL_SEC:
+            self._last_body = generate_latest(self.registry)
+            self._last_ts = now
+        return self._last_body, CONTENT_TYPE_LATEST
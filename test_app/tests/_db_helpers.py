@@ -0,0 +1,19 @@
+from common.db import get_conn
+
+# open carts and their items go in one statement (one round trip); the cart_items
+# foreign key is checked at the end of the statement, after both deletes
+SQL_DELETE_OPEN_CARTS = """
+    WITH open_carts AS (
+        SELECT id FROM carts WHERE user_id = %s AND status='open'
+    ), _items AS (
+        DELETE FROM cart_items WHERE cart_id IN (SELECT id FROM open_carts)
+    )
+    DELETE FROM carts WHERE id IN (SELECT id FROM open_carts);
+"""
+
+
+def cleanup_user(user_id: str):
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(SQL_DELETE_OPEN_CARTS, (user_id,))
+        conn.commit()
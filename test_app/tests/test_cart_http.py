@@ -1,24 +1,14 @@
 import pytest
 
 from common import env  # noqa: F401
-from common.db import db_available, get_conn
+from common.db import db_available
 from microservices.cart.app import CartApp
+from _db_helpers import cleanup_user
 
 
 pytestmark = pytest.mark.skipif(not db_available(), reason="Postgres not available on this machine")
 
 
-def _cleanup_user(user_id: str):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM cart_items WHERE cart_id IN (SELECT id FROM carts WHERE user_id = %s AND status='open');",
-                (user_id,),
-            )
-            cur.execute("DELETE FROM carts WHERE user_id = %s AND status='open';", (user_id,))
-        conn.commit()
-
-
 def _client():
     app = CartApp()
     app.setup_routes()
@@ -27,7 +17,7 @@ def _client():
 
 def test_http_add_get_checkout_bob():
     user = "bob"
-    _cleanup_user(user)
+    cleanup_user(user)
 
     client = _client()
 
@@ -1,24 +1,14 @@
 from microservices.cart.cart_service import CartService
 from common.db import get_conn, db_available
+from _db_helpers import cleanup_user
 import pytest
 
 
 pytestmark = pytest.mark.skipif(not db_available(), reason="Postgres not available on this machine")
 
 
-def _cleanup_bob_open_cart():
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM cart_items WHERE cart_id IN (SELECT id FROM carts WHERE user_id = %s AND status='open');",
-                ("bob",),
-            )
-            cur.execute("DELETE FROM carts WHERE user_id = %s AND status='open';", ("bob",))
-        conn.commit()
-
-
 def test_add_to_cart_and_get_cart_for_bob():
-    _cleanup_bob_open_cart()
+    cleanup_user("bob")
     svc = CartService("cart", 5002)
 
     svc.add_to_cart("bob", 1)
@@ -35,7 +25,7 @@ def test_add_to_cart_and_get_cart_for_bob():
 
 
 def test_checkout_creates_order_and_closes_cart_for_bob():
-    _cleanup_bob_open_cart()
+    cleanup_user("bob")
     svc = CartService("cart", 5002)
     svc.add_to_cart("bob", 1)
     svc.add_to_cart("bob", 2)
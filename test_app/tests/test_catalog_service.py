@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from microservices.catalog.catalog_service import CatalogService
@@ -31,3 +33,9 @@ def test_get_item_by_id_success(service):
 def test_get_item_not_found_raises_keyerror(service):
     with pytest.raises(KeyError):
         service.get_item(999999)
+
+
+def test_items_json_matches_fallback_catalog(service):
+    if service.items_json is None:
+        pytest.skip("catalog is DB-backed; items are encoded per request")
+    assert json.loads(service.items_json) == service.list_items()
@@ -1,8 +1,58 @@
 import types
-import pathlib
 import json
+import subprocess
+import time
+
+import pytest
 
 import fault_agent.chaos_agent as ca
+import fault_agent.chaos_worker as cw
+import fault_agent.docker_functions as df
+
+
+@pytest.fixture(autouse=True)
+def _fresh_container_cache(monkeypatch):
+    monkeypatch.setattr(ca, '_CONTAINERS', ca._ContainerCache())
+
+
+@pytest.fixture(autouse=True)
+def _no_docker_socket(monkeypatch, tmp_path):
+    # force the docker CLI fallback; tests below patch _run / docker_functions
+    monkeypatch.setattr(ca, '_DOCKER', ca.DockerAPI(str(tmp_path / 'no-docker.sock')))
+    monkeypatch.setattr(df, '_API', ca.DockerAPI(str(tmp_path / 'no-docker.sock')))
+
+
+@pytest.fixture(autouse=True)
+def _no_subprocess_or_sleep(monkeypatch):
+    # no test shells out to a real docker CLI or waits out a fault window; tests that
+    # check the command or the sleeps patch these again
+    monkeypatch.setattr(ca, '_run', lambda cmd, timeout=30: {'cmd': ' '.join(cmd), 'stdout': '', 'stderr': '', 'rc': 0, 'error': None})
+    monkeypatch.setattr(df, '_run_docker', lambda args, timeout=30: {'cmd': ' '.join(['docker'] + args), 'stdout': '', 'stderr': '', 'rc': 0, 'error': None})
+    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(time=time.time, monotonic=time.monotonic, sleep=lambda s: None))
+
+
+# deterministic stand-in for chaos_agent.random: every choice() takes the first option
+_FIRST_CHOICE = types.SimpleNamespace(choice=lambda xs: xs[0])
+
+
+# Stands in for chaos_agent._HTTP; tests set status/body, or exc to make get() raise
+class FakeHttp:
+    def __init__(self):
+        self.status = 200
+        self.body = b''
+        self.exc = None
+
+    def get(self, url, timeout=3):
+        if self.exc is not None:
+            raise self.exc
+        return self.status, self.body
+
+
+@pytest.fixture
+def fake_http(monkeypatch):
+    http = FakeHttp()
+    monkeypatch.setattr(ca, '_HTTP', http)
+    return http
 
 
 # Tests: chaos_agent.is_monitoring_container
@@ -20,10 +70,11 @@ def test_parse_size_to_bytes():
 
 
 # Tests: chaos_agent.docker_stats_once (parse path)
-def test_docker_stats_once_parse(monkeypatch):
+def test_docker_stats_once_parse(monkeypatch, tmp_path):
     def fake_run(cmd, timeout=30):
         return {'stdout': '12.5%|123MiB / 1GiB|33.3%|1kB / 2kB|3MB / 4MB', 'error': None}
     monkeypatch.setattr(ca, '_run', fake_run)
+    monkeypatch.setattr(ca, '_CGROUP', ca._CgroupReader(root=str(tmp_path / 'no-cgroup')))
     out = ca.docker_stats_once('c')
     assert out['cpu_pct'] == 12.5
     assert out['mem_pct'] == 33.3
@@ -37,17 +88,75 @@ def test_docker_stats_once_error(monkeypatch):
     assert 'error' in out
 
 
-# Tests: chaos_agent.update_resources (cpu+mem flags)
-def test_update_resources_builds_flags(monkeypatch):
-    captured = {}
+# Tests: chaos_agent._CgroupReader (cgroup v2 files + cpu delta)
+def test_docker_stats_once_reads_cgroup(monkeypatch, tmp_path):
+    cg = tmp_path / 'system.slice' / 'docker-abc123.scope'
+    cg.mkdir(parents=True)
+    (cg / 'cpu.stat').write_text('usage_usec 1000000\nuser_usec 600000\n')
+    (cg / 'memory.current').write_text('3000\n')
+    (cg / 'memory.max').write_text('10000\n')
+    (cg / 'memory.stat').write_text('anon 2000\ninactive_file 1000\n')
+    runs = []
+    monkeypatch.setattr(ca, '_run', lambda cmd, timeout=30: runs.append(cmd) or {'stdout': 'abc123', 'error': None})
+    clock = iter([10.0, 12.0])
+    monkeypatch.setattr(ca.time, 'monotonic', lambda: next(clock))
+    monkeypatch.setattr(ca, '_CGROUP', ca._CgroupReader(root=str(tmp_path)))
+
+    first = ca.docker_stats_once('testapp_cart')
+    assert first['cpu_pct'] is None
+    assert first['mem_used_bytes'] == 2000.0 and first['mem_limit_bytes'] == 10000.0
+    assert first['mem_pct'] == 20.0
+
+    (cg / 'cpu.stat').write_text('usage_usec 2000000\n')
+    second = ca.docker_stats_once('testapp_cart')
+    assert second['cpu_pct'] == 50.0
+    # container id is resolved once; no `docker stats` subprocess
+    assert len(runs) == 1 and 'inspect' in runs[0]
+
+
+# Tests: chaos_agent._CgroupReader (root without the containers' cgroups)
+def test_docker_stats_once_skips_unusable_cgroup_root(monkeypatch, tmp_path):
+    runs = []
+    def fake_run(cmd, timeout=30):
+        runs.append(cmd)
+        if 'inspect' in cmd:
+            return {'stdout': 'abc123', 'error': None}
+        return {'stdout': '12.5%|123MiB / 1GiB|33.3%|1kB / 2kB|3MB / 4MB', 'error': None}
+    monkeypatch.setattr(ca, '_run', fake_run)
+    # the root exists (as inside a container) but holds no docker cgroups
+    monkeypatch.setattr(ca, '_CGROUP', ca._CgroupReader(root=str(tmp_path)))
+
+    assert ca.docker_stats_once('testapp_cart')['cpu_pct'] == 12.5
+    assert ca.docker_stats_once('testapp_cart')['cpu_pct'] == 12.5
+    assert sum('inspect' in cmd for cmd in runs) == 1
+    assert sum('stats' in cmd for cmd in runs) == 2
+
+
+def _flag(cmd, flag):
+    # value following flag in a captured argv list; None when the flag is absent
+    try:
+        return cmd[cmd.index(flag) + 1]
+    except ValueError:
+        return None
+
+
+# Tests: chaos_agent.update_resources (cpu+mem, cpu-only, mem-only flags)
+@pytest.mark.parametrize('cpu, mem, expected', [
+    (40, 256, {'--cpu-period': '100000', '--cpu-quota': '40000', '--memory': '256m'}),
+    (50, None, {'--cpu-period': '100000', '--cpu-quota': '50000', '--memory': None}),
+    (None, 128, {'--cpu-period': None, '--cpu-quota': None, '--memory': '128m'}),
+], ids=['cpu_and_mem', 'cpu_only', 'mem_only'])
+def test_update_resources_builds_flags(monkeypatch, cpu, mem, expected):
+    captured = []
     def fake_run(args, timeout=30):
-        captured['cmd'] = ' '.join(args)
-        return {'rc': 0, 'error': None, 'stdout': '', 'stderr': '', 'cmd': captured['cmd']}
+        captured.append(list(args))
+        return {'rc': 0, 'error': None, 'stdout': '', 'stderr': '', 'cmd': ' '.join(args)}
     monkeypatch.setattr(ca, '_run', fake_run)
-    ca.update_resources('cart', cpu_percent=40, mem_limit_mb=256)
-    cmd = captured['cmd']
-    assert '--cpu-period 100000' in cmd and '--cpu-quota' in cmd
-    assert '--memory 256m' in cmd and cmd.endswith('cart')
+    ca.update_resources('cart', cpu_percent=cpu, mem_limit_mb=mem)
+    cmd = captured[-1]
+    for flag, value in expected.items():
+        assert _flag(cmd, flag) == value
+    assert cmd[-1] == 'cart'
 
 
 # Tests: chaos_agent.burn_cpu_in_container & burn_mem_in_container
@@ -56,15 +165,98 @@ def test_burn_cpu_and_mem(monkeypatch):
     monkeypatch.setattr(ca, 'docker_exec', lambda name, exec_cmd, detach=True, timeout=30: calls.append(exec_cmd) or {'rc': 0})
     ca.burn_cpu_in_container('cart', seconds=5)
     ca.burn_mem_in_container('cart', mb=2, seconds=5)
-    assert any('python' in c for c in calls)
+    assert calls[0] == ['sh', '-c', "timeout 5 sh -c 'while :; do :; done'"]
+    assert calls[1][0] == 'python'
+
+
+# Tests: chaos_agent.start_worker & send_to_worker (worker path + fallback)
+def test_worker_dispatch_and_fallback(monkeypatch):
+    monkeypatch.setattr(ca, '_WORKERS', set())
+    monkeypatch.setattr(ca, '_run', lambda cmd, timeout=30: {'rc': 0, 'error': None})
+    calls = []
+    def fake_exec(name, cmd, detach=True, timeout=30):
+        calls.append(cmd)
+        return {'rc': 0, 'error': None}
+    monkeypatch.setattr(ca, 'docker_exec', fake_exec)
+
+    assert ca.start_worker('cart') is True
+    assert calls[-1] == ['python', ca.WORKER_PATH]
+    # stale pid/fifo/status from before a restart are cleared before launching
+    assert calls[-2][:2] == ['sh', '-c'] and f'rm -f {ca.WORKER_PID}' in calls[-2][2]
+    ca.burn_cpu_in_container('cart', seconds=5)
+    assert calls[-1][:2] == ['sh', '-c'] and json.loads(calls[-1][-1]) == {'op': 'cpu', 'secs': 5}
+
+    # a dead worker is forgotten and the one-off payload is used instead
+    monkeypatch.setattr(ca, 'docker_exec', lambda name, cmd, detach=True, timeout=30: calls.append(cmd) or (
+        {'error': 'exit 1'} if cmd[0] == 'sh' else {'rc': 0, 'error': None}))
+    ca.burn_mem_in_container('cart', mb=2, seconds=5)
+    assert calls[-1][0] == 'python' and 'cart' not in ca._WORKERS
+
+
+# Tests: chaos_agent.send_to_worker (unconfirmed result + drained worker failures)
+def test_send_to_worker_reports_logged_failures(monkeypatch):
+    monkeypatch.setattr(ca, '_WORKERS', {'cart'})
+    logged = json.dumps({'ts': 1.0, 'op': 'iptables_drop', 'error': 'RuntimeError: iptables -I: denied'})
+    monkeypatch.setattr(ca, 'docker_exec', lambda name, cmd, detach=True, timeout=30: (
+        {'rc': 0, 'error': None, 'stdout': logged + '\n'}))
+    res = ca.burn_cpu_in_container('cart', seconds=5)
+    assert res['confirmed'] is False
+    assert [f['op'] for f in res['worker_failures']] == ['iptables_drop']
+
+
+# Tests: chaos_worker.handle (failed and unknown ops are logged, not swallowed)
+def test_worker_logs_failed_ops(monkeypatch, tmp_path, capsys):
+    status = tmp_path / 'status'
+    monkeypatch.setattr(cw, 'STATUS_PATH', str(status))
+    def no_iptables(cmd, **kw):
+        raise subprocess.CalledProcessError(3, cmd, stderr='Permission denied (you must be root)')
+    monkeypatch.setattr(cw.subprocess, 'run', no_iptables)
+    monkeypatch.setattr(cw.threading, 'Thread', lambda target, args, daemon: types.SimpleNamespace(start=lambda: target(*args)))
+
+    cw.handle(json.dumps({'op': 'iptables_drop', 'port': 5000, 'secs': 0}))
+    cw.handle(json.dumps({'op': 'nope'}))
+    lines = [json.loads(l) for l in status.read_text().splitlines()]
+    assert [l['op'] for l in lines] == ['iptables_drop', 'nope']
+    assert 'Permission denied' in lines[0]['error']
+    assert capsys.readouterr().err.count('\n') == 2
+
+
+# Tests: chaos_worker._already_running (a reused pid from before a restart is not the worker)
+def test_worker_ignores_stale_pid(monkeypatch, tmp_path):
+    pid_file = tmp_path / 'pid'
+    monkeypatch.setattr(cw, 'PID_PATH', str(pid_file))
+    sleeper = subprocess.Popen(['sleep', '30'])
+    try:
+        pid_file.write_text(str(sleeper.pid))
+        assert cw._already_running() is False
+    finally:
+        sleeper.kill()
+        sleeper.wait()
+
+
+# Tests: chaos_agent.worker_failures & Stats.add_failure (late worker failures count as errors)
+def test_worker_failures_counted_as_errors():
+    failure = {'ts': 1.0, 'op': 'iptables_drop', 'error': 'RuntimeError: denied'}
+    res = {'worker': {'rc': 0, 'confirmed': False, 'worker_failures': [failure]}, 'port': 5000}
+    assert ca.worker_failures(res) == [failure]
+    assert ca.worker_failures({'rc': 0, 'worker_failures': [failure]}) == [failure]
+    assert ca.worker_failures({'error': 'boom'}) == []
+
+    s = ca.Stats()
+    s.add('cpu_hog', 'cart', ok=True)
+    for f in ca.worker_failures(res):
+        s.add_failure(ca.WORKER_OP_FAULTS[f['op']], 'cart')
+    summary = s.summary()
+    assert summary['total_actions'] == 1 and summary['errors'] == 1
+    assert summary['errors_by_action'] == {'metrics_block': 1}
+    assert summary['errors_by_target'] == {'cart': 1}
 
 
 # Tests: chaos_agent.pause_unpause
 def test_pause_unpause(monkeypatch):
     monkeypatch.setattr(ca, 'pause_container', lambda n: {'ok': True})
     monkeypatch.setattr(ca, 'unpause_container', lambda n: {'ok': True})
-    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(sleep=lambda s: None))
-    monkeypatch.setattr(ca, 'random', types.SimpleNamespace(choice=lambda xs: xs[0]))
+    monkeypatch.setattr(ca, 'random', _FIRST_CHOICE)
     res = ca.pause_unpause('cart')
     assert 'pause' in res and 'unpause' in res
 
@@ -72,8 +264,7 @@ def test_pause_unpause(monkeypatch):
 # Tests: chaos_agent.kill_restart
 def test_kill_restart(monkeypatch):
     monkeypatch.setattr(ca, 'kill_container', lambda n: {'ok': True})
-    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(sleep=lambda s: None))
-    monkeypatch.setattr(ca, 'random', types.SimpleNamespace(choice=lambda xs: xs[0]))
+    monkeypatch.setattr(ca, 'random', _FIRST_CHOICE)
     captured = {}
     monkeypatch.setattr(ca, '_run', lambda args, timeout=30: captured.setdefault('cmd', ' '.join(args)) or {'rc': 0, 'error': None})
     res = ca.kill_restart('cart')
@@ -83,7 +274,7 @@ def test_kill_restart(monkeypatch):
 
 # Tests: chaos_agent.pick_targets (exclusion logic)
 def test_pick_targets_excludes_monitoring(monkeypatch):
-    monkeypatch.setattr(ca, 'list_containers', lambda all=False: {'containers': [{'Names': 'testapp_cart'}, {'Names': 'prometheus'}]})
+    monkeypatch.setattr(ca, 'list_containers', lambda all=False: {'containers': [{'Names': 'testapp_cart', 'State': 'running'}, {'Names': 'prometheus', 'State': 'running'}]})
     monkeypatch.setattr(ca, 'is_monitoring_container', lambda n: n == 'prometheus')
     assert ca.pick_targets([]) == ['testapp_cart']
 
@@ -92,8 +283,9 @@ def test_pick_targets_excludes_monitoring(monkeypatch):
 def test_monitor_check_target(monkeypatch, tmp_path):
     m = ca.Monitor(log_path=tmp_path / 'chaos.log')
     monkeypatch.setattr(ca, 'is_monitoring_container', lambda n: n == 'grafana')
-    monkeypatch.setattr(ca, 'container_exists', lambda n: n in {'ok', 'stopped'})
-    monkeypatch.setattr(ca, 'is_running_container', lambda n: n == 'ok')
+    monkeypatch.setattr(ca, 'list_containers', lambda all=False: {
+        'containers': [{'Names': 'ok', 'State': 'running'}, {'Names': 'stopped', 'State': 'exited'}]
+    })
 
     ok, reason = m.check_target('grafana')
     assert ok is False and 'monitoring' in reason
@@ -105,11 +297,29 @@ def test_monitor_check_target(monkeypatch, tmp_path):
     assert ok is True and reason is None
 
 
+# Tests: chaos_agent._ContainerCache.check (negative caching)
+def test_container_cache_check_caches_missing(monkeypatch):
+    clock = {'now': 0.0}
+    scans = []
+    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(time=lambda: clock['now'], monotonic=lambda: clock['now'], sleep=lambda s: None))
+    monkeypatch.setattr(ca, 'list_containers', lambda all=False: scans.append(1) or {'containers': [{'Names': 'ok', 'State': 'running'}]})
+    cache = ca._ContainerCache()
+    assert cache.check('stale') == (False, 'target not found')
+    clock['now'] = 10.0
+    assert cache.check('stale') == (False, 'target not found')
+    assert cache.check('ok') == (True, None)
+    assert len(scans) == 2
+    clock['now'] = 11.0
+    assert cache.check('ok') == (True, None)
+    assert len(scans) == 2
+    cache.invalidate()
+    assert cache.check('stale') == (False, 'target not found')
+    assert len(scans) == 3
+
+
 # Tests: chaos_agent.require_valid_target (invalid target logs)
 def test_require_valid_target_logs(monkeypatch, tmp_path):
     m = ca.Monitor(log_path=tmp_path / 'chaos.log')
-    log_calls = []
-    monkeypatch.setattr(ca, 'write_log_line', lambda path, ev: log_calls.append(ev))
     monkeypatch.setattr(ca.Monitor, 'check_target', lambda self, n: (False, 'bad'))
 
     def fn(name): return {'ok': True}
@@ -117,29 +327,14 @@ def test_require_valid_target_logs(monkeypatch, tmp_path):
     wrapped = ca.require_valid_target(m)(fn)
     res = wrapped('x')
     assert res['error'] == 'bad'
+    m.flush()
+    log_calls = [json.loads(line) for line in (tmp_path / 'chaos.log').read_text().splitlines()]
     assert log_calls and log_calls[0]['violation'] == 'bad'
 
 
 # Tests: chaos_agent.prom_query (success) & eval_prom_queries
-def test_prom_query_and_eval(monkeypatch):
-    class FakeResponse:
-        def __enter__(self):
-            return self
-        def __exit__(self, exc_type, exc, tb):
-            return False
-        def read(self):
-            return json.dumps({'status': 'success', 'data': {'result': []}}).encode('utf-8')
-
-    class FakeRequestModule:
-        @staticmethod
-        def urlopen(url, timeout=4):
-            return FakeResponse()
-
-    monkeypatch.setattr(ca, 'urllib', types.SimpleNamespace(
-        request=FakeRequestModule,
-        parse=ca.urllib.parse,
-        error=ca.urllib.error
-    ))
+def test_prom_query_and_eval(monkeypatch, fake_http):
+    fake_http.body = json.dumps({'status': 'success', 'data': {'result': []}}).encode('utf-8')
     data = ca.prom_query('http://localhost:9090', 'up')
     assert data.get('status') == 'success'
 
@@ -148,21 +343,68 @@ def test_prom_query_and_eval(monkeypatch):
     assert vals['x'] == 1.23
 
 
-# Tests: chaos_agent.disk_fill & metrics_block (iptables fallback)
+# Tests: chaos_agent.gather_snapshot & eval_prom_queries (thread pool fan-out)
+def test_gather_snapshot_concurrent(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    queried = []
+    def fake_query(url, q):
+        queried.append(q)
+        if q.startswith('label_replace('):
+            return {'status': 'success', 'data': {'result': [
+                {'metric': {'alias': 'up', 'instance': 'cart:5002'}, 'value': [0, '1']},
+                {'metric': {'alias': 'cpu_seconds_per_s'}, 'value': [0, '0.25']},
+                {'metric': {'alias': 'rss_bytes'}, 'value': [0, '1024']},
+            ]}}
+        return {'status': 'success', 'data': {'result': [{'value': [0, '1']}]}}
+    monkeypatch.setattr(ca, 'prom_query', fake_query)
+    monkeypatch.setattr(ca, 'probe_target', lambda n: 5.0)
+    monkeypatch.setattr(ca, 'docker_stats_once', lambda n: {'cpu_pct': 1.0})
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        snap = ca.gather_snapshot(pool, 'http://p', 'testapp_cart', 'cart:5002', do_probe=True)
+        vals = ca.eval_prom_queries('http://p', {'a': 'x', 'b': 'y'}, pool=pool)
+    assert snap['probe_ms'] == 5.0 and snap['docker'] == {'cpu_pct': 1.0}
+    assert snap['up'] == 1.0
+    assert snap['prom'] == {'cpu_seconds_per_s': 0.25, 'rss_bytes': 1024.0, 'throughput_rps': None, 'amount_p90': None}
+    assert vals == {'a': 1.0, 'b': 1.0}
+    # one composite request per snapshot covers up and every per-target query
+    assert len(queried) == 3
+    assert 'label_replace(up{instance="cart:5002"}, "alias", "up", "", "")' in queried[0]
+    assert ' or label_replace(sum(rate(cart_checkout_total' in queried[0]
+
+
+# Tests: chaos_agent.disk_fill & metrics_block (attached setup, detached hold + cleanup)
 def test_disk_fill_and_metrics_block(monkeypatch):
     calls = []
     def fake_exec(name, cmd, detach=True, timeout=30):
         calls.append((' '.join(cmd), detach))
-        if 'iptables -I' in ' '.join(cmd):
-            return {'error': 'iptables unavailable'}
         return {'rc': 0, 'error': None}
     monkeypatch.setattr(ca, 'docker_exec', fake_exec)
     res1 = ca.disk_fill('cart')
-    assert 'create' in res1 and 'cleanup' in res1
+    assert res1['exec'] == {'rc': 0, 'error': None} and 'error' not in res1
+    assert [detach for _, detach in calls] == [False, True]
+    assert 'dd if=/dev/zero' in calls[0][0] and 'rm -f /tmp/chaos_bloat.dat' in calls[1][0]
 
+    calls.clear()
     res2 = ca.metrics_block('testapp_cart')
-    assert 'iptables_add' in res2 and 'iptables_remove' in res2
-    assert isinstance(res2.get('fallback_patch'), dict)
+    assert res2['port'] == 5002 and 'error' not in res2
+    assert [detach for _, detach in calls] == [False, True]
+    assert 'iptables -I INPUT -p tcp --dport 5002 -j DROP' in calls[0][0]
+    assert 'iptables -D INPUT -p tcp --dport 5002 -j DROP' in calls[1][0]
+
+
+# Tests: chaos_agent.disk_fill & metrics_block (setup failure is reported, nothing detached)
+def test_disk_fill_and_metrics_block_report_setup_failure(monkeypatch):
+    calls = []
+    def fake_exec(name, cmd, detach=True, timeout=30):
+        calls.append(detach)
+        return {'rc': 1, 'error': 'iptables: Permission denied (you must be root)'}
+    monkeypatch.setattr(ca, 'docker_exec', fake_exec)
+
+    res = ca.metrics_block('testapp_cart')
+    assert res['error'].startswith('iptables: Permission denied')
+    res = ca.disk_fill('cart')
+    assert res['error']
+    assert calls == [False, False]
 
 
 # Tests: chaos_agent.log_event (JSON and text)
@@ -189,20 +431,37 @@ def test_write_log_line(tmp_path):
 
 
 # Tests: chaos_agent.discover_instance_for_target
-def test_discover_instance_for_target(monkeypatch):
-    def fake_query(url, q):
-        return {
-            "status": "success",
-            "data": {
-                "result": [
-                    {"metric": {"instance": "cart:5002"}},
-                    {"metric": {"instance": "payment:5004"}},
-                ]
-            }
-        }
-    monkeypatch.setattr(ca, 'prom_query', fake_query)
-    inst = ca.discover_instance_for_target('http://localhost:9090', 'test_app', 'testapp_cart')
-    assert inst == 'cart:5002'
+_DISCOVERY_RESP = {
+    "status": "success",
+    "data": {
+        "result": [
+            {"metric": {"instance": "cart:5002"}},
+            {"metric": {"instance": "payment:5004"}},
+        ]
+    }
+}
+
+
+@pytest.mark.parametrize('target, expected', [
+    ('testapp_cart', 'cart:5002'),
+    # payment listens on 5003; an instance on another port is not it
+    ('testapp_payment', None),
+    ('testapp_other', None),
+])
+def test_discover_instance_for_target(monkeypatch, target, expected):
+    monkeypatch.setattr(ca, 'prom_query', lambda url, q: _DISCOVERY_RESP)
+    inst = ca.discover_instance_for_target('http://localhost:9090', 'test_app', target)
+    assert inst == expected
+
+
+# Tests: chaos_agent.resolve_instance (memoized discovery with label fallback)
+def test_resolve_instance_caches_discovery(monkeypatch):
+    monkeypatch.setattr(ca, '_INSTANCE_CACHE', {})
+    calls = []
+    monkeypatch.setattr(ca, 'discover_instance_for_target', lambda u, j, t: calls.append(t) or None)
+    assert ca.resolve_instance('http://p', 'test_app', 'testapp_cart') == 'cart:5002'
+    assert ca.resolve_instance('http://p', 'test_app', 'testapp_cart') == 'cart:5002'
+    assert calls == ['testapp_cart']
 
 
 # Tests: chaos_agent.prom_instance_label
@@ -224,69 +483,48 @@ def test_log_event_text_modes(capsys):
     assert 'status=boom' in out_err
 
 
-# Tests: chaos_agent.update_resources (cpu-only)
-def test_update_resources_cpu_only(monkeypatch):
-    captured = {}
-    monkeypatch.setattr(ca, '_run', lambda args, timeout=30: captured.setdefault('cmd', ' '.join(args)) or {'rc': 0})
-    ca.update_resources('cart', cpu_percent=50, mem_limit_mb=None)
-    assert '--cpu-quota' in captured['cmd'] and '--memory' not in captured['cmd']
-
-
-# Tests: chaos_agent.update_resources (mem-only)
-def test_update_resources_mem_only(monkeypatch):
-    captured = {}
-    monkeypatch.setattr(ca, '_run', lambda args, timeout=30: captured.setdefault('cmd', ' '.join(args)) or {'rc': 0})
-    ca.update_resources('cart', cpu_percent=None, mem_limit_mb=128)
-    assert '--memory 128m' in captured['cmd'] and '--cpu-quota' not in captured['cmd']
-
-
 # Tests: chaos_agent.is_running_container & container_exists
 def test_container_exists_and_is_running(monkeypatch):
-    monkeypatch.setattr(ca, 'list_containers', lambda all=False: {
-        'containers': [{'Names': 'testapp_cart'}]
-    })
+    calls = []
+    def fake_list(all=False):
+        calls.append(all)
+        return {'containers': [
+            {'Names': 'testapp_cart', 'State': 'running'},
+            {'Names': 'stopped_one', 'State': 'exited'},
+            {'Names': 'legacy', 'Status': 'Up 3 minutes'},
+        ]}
+    monkeypatch.setattr(ca, 'list_containers', fake_list)
     assert ca.is_running_container('testapp_cart') is True
+    assert ca.is_running_container('legacy') is True
+    assert ca.is_running_container('stopped_one') is False
     assert ca.is_running_container('missing') is False
 
-    monkeypatch.setattr(ca, 'list_containers', lambda all=True: {
-        'containers': [{'Names': 'testapp_cart'}, {'Names': 'stopped_one'}]
-    })
     assert ca.container_exists('testapp_cart') is True
     assert ca.container_exists('stopped_one') is True
     assert ca.container_exists('missing') is False
+    # one `docker ps -a` round-trip serves every lookup within the TTL
+    assert calls == [True]
 
 
-# Tests: chaos_agent.metrics_block (fallback + remove)
-def test_metrics_block_fallback(monkeypatch):
-    calls = {}
-    def fake_exec(name, cmd, detach=True, timeout=30):
-        scmd = ' '.join(cmd)
-        if 'iptables -I' in scmd:
-            return {'error': 'iptables unavailable'}
-        calls.setdefault('cmds', []).append(scmd)
-        return {'rc': 0}
-    monkeypatch.setattr(ca, 'docker_exec', fake_exec)
-    res = ca.metrics_block('testapp_cart')
-    assert res['iptables_add'].get('error')
-    assert isinstance(res['fallback_patch'], dict)
-    assert 'iptables -D' in calls['cmds'][-1]
+# Tests: chaos_agent.metrics_block (unknown port)
+def test_metrics_block_unknown_port(monkeypatch):
+    monkeypatch.setattr(ca, 'docker_exec', lambda *a, **k: pytest.fail('exec for unknown target'))
+    assert ca.metrics_block('testapp_other') == {'error': 'unknown port'}
 
 
 # Tests: chaos_agent.probe_target (unknown/success)
-def test_probe_target_unknown_and_success(monkeypatch):
+def test_probe_target_unknown_and_success(monkeypatch, fake_http):
     assert ca.probe_target('unknown') is None
 
-    class _Resp:
-        status = 200
-        def __enter__(self): return self
-        def __exit__(self, *a): return False
-    monkeypatch.setattr(ca.urllib.request, 'urlopen', lambda url, timeout=3: _Resp())
-    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(time=lambda: 1.0, sleep=lambda s: None))
+    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(time=lambda: 1.0, monotonic=lambda: 1.0, sleep=lambda s: None))
     assert isinstance(ca.probe_target('testapp_cart'), float)
 
 
 # Tests: chaos_agent.build_focused_executor (all fault mappings)
-def test_build_focused_executor_all_faults(monkeypatch):
+@pytest.mark.parametrize('fault', [
+    'cpu_hog', 'memory_hog', 'pause', 'restart', 'kill_restart', 'cpu_quota', 'mem_limit', 'disk_fill', 'metrics_block',
+])
+def test_build_focused_executor_all_faults(monkeypatch, fault):
     monkeypatch.setattr(ca, 'docker_exec', lambda *a, **k: {'rc': 0})
     monkeypatch.setattr(ca, 'pause_container', lambda n: {'ok': True})
     monkeypatch.setattr(ca, 'unpause_container', lambda n: {'ok': True})
@@ -295,24 +533,113 @@ def test_build_focused_executor_all_faults(monkeypatch):
     monkeypatch.setattr(ca, 'update_resources', lambda n, **k: {'rc': 0})
     monkeypatch.setattr(ca, 'disk_fill', lambda n: {'rc': 0})
     monkeypatch.setattr(ca, 'metrics_block', lambda n: {'rc': 0})
-    faults = [
-        'cpu_hog','memory_hog','pause','restart','kill_restart','cpu_quota','mem_limit','disk_fill','metrics_block'
-    ]
-    for f in faults:
-        fn = ca.build_focused_executor(f, hog_mem_mb=64, monitor=None)
-        out = fn('testapp_cart')
-        assert isinstance(out, dict)
+    fn = ca.build_focused_executor(fault, hog_mem_mb=64, monitor=None)
+    out = fn('testapp_cart')
+    assert isinstance(out, dict)
 
 
 # Tests: chaos_agent.prom_query (error path)
-def test_prom_query_error_path(monkeypatch):
-    def raiser(*a, **k):
-        raise RuntimeError('boom')
-    monkeypatch.setattr(ca.urllib.request, 'urlopen', raiser)
+def test_prom_query_error_path(fake_http):
+    fake_http.exc = RuntimeError('boom')
     data = ca.prom_query('http://localhost:9090', 'up')
     assert 'error' in data
 
 
+# Tests: chaos_agent._HttpPool (keep-alive reuse against a local server)
+def test_http_pool_reuses_connection():
+    import http.server
+    import threading
+
+    peers = set()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        def do_GET(self):
+            peers.add(self.client_address)
+            body = b'{"status": "success"}'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *a):
+            pass
+
+    srv = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=srv.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+    try:
+        pool = ca._HttpPool()
+        url = f'http://127.0.0.1:{srv.server_address[1]}/api/v1/query?query=up'
+        assert pool.get(url, timeout=2) == (200, b'{"status": "success"}')
+        assert pool.get(url, timeout=2)[0] == 200
+        assert len(peers) == 1
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+# Tests: docker_functions.DockerAPI (Engine API over a Unix socket)
+def test_docker_api_update_and_exec(monkeypatch, tmp_path):
+    import http.server
+    import socketserver
+    import threading
+
+    seen = []
+    conns = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        def setup(self):
+            super().setup()
+            conns.append(self.connection)
+        def _reply(self, status, body=b''):
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def do_POST(self):
+            n = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(n) or b'null')
+            seen.append((self.path, body))
+            if self.path.endswith('/exec'):
+                self._reply(201, b'{"Id": "e1"}')
+            elif self.path == '/exec/e1/start':
+                self._reply(200, b'\x01\x00\x00\x00\x00\x00\x00\x02hi\x02\x00\x00\x00\x00\x00\x00\x03err')
+            else:
+                self._reply(200, b'{"Warnings": []}')
+        def do_GET(self):
+            if self.path.startswith('/containers/json'):
+                self._reply(200, b'[{"Id": "0123456789abcdef", "Names": ["/testapp_cart"], "State": "running", "Status": "Up 1 minute"}]')
+            else:
+                self._reply(200, b'{"ExitCode": 3}')
+        def address_string(self):
+            return 'unix'
+        def log_message(self, *a):
+            pass
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    path = str(tmp_path / 'docker.sock')
+    srv = Server(path, Handler)
+    threading.Thread(target=srv.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+    try:
+        api = ca.DockerAPI(path)
+        res = api.update('cart', {'CpuPeriod': 100000, 'CpuQuota': 40000})
+        assert res['error'] is None and res['rc'] == 0
+        assert seen[0] == ('/containers/cart/update', {'CpuPeriod': 100000, 'CpuQuota': 40000})
+        out = api.exec('cart', ['sh', '-c', 'echo hi'], detach=False)
+        assert (out['stdout'], out['stderr'], out['rc']) == ('hi', 'err', 3)
+        assert seen[1][1]['Cmd'] == ['sh', '-c', 'echo hi']
+        assert len(conns) == 1
+        monkeypatch.setattr(df, '_API', api)
+        rows = df.list_containers(all=True)['containers']
+        assert rows == [{'ID': '0123456789ab', 'Image': None, 'Command': None, 'Names': 'testapp_cart', 'State': 'running', 'Status': 'Up 1 minute'}]
+        assert ca.DockerAPI(str(tmp_path / 'missing.sock')).kill('cart') is None
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
 # Tests: chaos_agent.Stats.add_uptime & summary (invalid values)
 def test_stats_add_uptime_invalid_values():
     s = ca.Stats()
@@ -327,9 +654,9 @@ def test_stats_add_uptime_invalid_values():
 def test_pick_targets_with_configured_filter(monkeypatch):
     monkeypatch.setattr(ca, 'list_containers', lambda all=False: {
         'containers': [
-            {'Names': 'testapp_cart'},
-            {'Names': 'testapp_payment'},
-            {'Names': 'prometheus'},
+            {'Names': 'testapp_cart', 'State': 'running'},
+            {'Names': 'testapp_payment', 'State': 'running'},
+            {'Names': 'prometheus', 'State': 'running'},
         ]
     })
     monkeypatch.setattr(ca, 'is_monitoring_container', lambda n: n == 'prometheus')
@@ -376,6 +703,7 @@ def test_stats_aggregation():
     assert summary['total_actions'] == 2
     assert summary['errors'] == 1
     assert summary['probe']['avg_latency_ms_before'] == 10.0
+    assert summary['probe']['std_latency_ms_before'] == 0.0
     assert summary['prom']['cpu']['avg_after'] == 2.0
     assert summary['docker']['cpu_pct']['avg_before'] == 10.0
 
@@ -397,7 +725,7 @@ def test_main_smoke(monkeypatch, tmp_path):
         json=True, log_file=str(tmp_path / 'chaos.log'), probe=False,
         prom_url='http://localhost:9090', prom_job='test_app', hog_mem_mb=64,
     ))
-    monkeypatch.setattr(ca, 'list_containers', lambda all=False: {'containers': [{'Names': 'testapp_cart'}]})
+    monkeypatch.setattr(ca, 'list_containers', lambda all=False: {'containers': [{'Names': 'testapp_cart', 'State': 'running'}]})
     monkeypatch.setattr(ca, 'is_monitoring_container', lambda n: False)
     monkeypatch.setattr(ca.Monitor, 'check_target', lambda self, n: (True, None))
     monkeypatch.setattr(ca, 'docker_exec', lambda name, cmd, detach=True, timeout=30: {'rc': 0})
@@ -406,11 +734,37 @@ def test_main_smoke(monkeypatch, tmp_path):
     monkeypatch.setattr(ca, 'prom_instance_label', lambda t: None)
     monkeypatch.setattr(ca, 'prom_query', lambda u, q: {'status': 'success', 'data': {'result': []}})
     monkeypatch.setattr(ca, 'eval_prom_queries', lambda u, qs: {})
-    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(time=lambda: 0.0, sleep=lambda x: None))
+    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(time=lambda: 0.0, monotonic=lambda: 0.0, sleep=lambda x: None))
     ca.main()
     assert (tmp_path / 'chaos.log').exists()
 
 
+# Tests: chaos_agent.main (deadline scheduler: cadence is interval-from-start, not work+interval)
+def test_main_deadline_cadence(monkeypatch, tmp_path):
+    monkeypatch.setattr(ca, 'parse_args', lambda: types.SimpleNamespace(
+        mode='focused', fault='restart', targets='testapp_cart', duration=30, interval=10,
+        json=True, log_file=str(tmp_path / 'chaos.log'), probe=False,
+        prom_url='http://localhost:9090', prom_job='test_app', hog_mem_mb=64,
+    ))
+    clock = {'now': 100.0}
+    sleeps = []
+    def sleep(s):
+        sleeps.append(s)
+        clock['now'] += s
+    monkeypatch.setattr(ca, 'time', types.SimpleNamespace(time=lambda: clock['now'], monotonic=lambda: clock['now'], sleep=sleep))
+    monkeypatch.setattr(ca, 'list_containers', lambda all=False: {'containers': [{'Names': 'testapp_cart', 'State': 'running'}]})
+    monkeypatch.setattr(ca, 'docker_stats_once', lambda name: {})
+    monkeypatch.setattr(ca, 'resolve_instance', lambda u, j, t: None)
+    def slow_restart(name):
+        clock['now'] += 4.0
+        return {'rc': 0}
+    monkeypatch.setattr(ca, 'restart_container', slow_restart)
+    ca.main()
+    # three iterations at t=100/110/120: a 5s settle overlaps the 4s fault, then each
+    # sleeps only what is left of its 10s slot
+    assert sleeps == [5.0, 1.0, 5.0, 1.0, 5.0]
+
+
 # Tests: chaos_agent.main (mixed mode early-exit + summary)
 def test_main_mixed_no_targets_summary(monkeypatch, tmp_path):
     monkeypatch.setattr(ca, 'parse_args', lambda: types.SimpleNamespace(
@@ -431,22 +785,20 @@ def test_get_prom_queries_for_target():
     assert 'throughput_rps' in cart_q and 'amount_p90' in cart_q
     pay_q = ca.get_prom_queries_for_target('testapp_payment', 'payment:5003')
     assert 'fail_rps' in pay_q and 'amount_p90' in pay_q
+    assert ca.get_prom_queries_for_target('testapp_cart', 'cart:5002') is cart_q
 
 
 # Tests: chaos_agent.probe_target (exception path)
-def test_probe_target_error_path(monkeypatch):
-    def raiser(*a, **k):
-        raise TimeoutError('timeout')
-    monkeypatch.setattr(ca.urllib.request, 'urlopen', raiser)
+def test_probe_target_error_path(fake_http):
+    fake_http.exc = TimeoutError('timeout')
     assert ca.probe_target('testapp_cart') is None
 
 
 # Tests: chaos_agent.write_log_line (exception path)
-def test_write_log_line_error(monkeypatch, tmp_path):
-    # Patch Path.open to raise to exercise exception path
+def test_write_log_line_error(tmp_path):
+    # the log path is a directory, so the real open() fails with IsADirectoryError
     p = tmp_path / 'bad.log'
-    def bad_open(self, *a, **k):
-        raise OSError('nope')
-    monkeypatch.setattr(pathlib.Path, 'open', bad_open)
+    p.mkdir()
     # Should not raise
-    ca.write_log_line(p, {'ok': True})
\ No newline at end of file
+    ca.write_log_line(p, {'ok': True})
+    assert list(p.iterdir()) == []
\ No newline at end of file
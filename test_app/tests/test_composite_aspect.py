@@ -0,0 +1,50 @@
+import pytest
+
+from observability.prometheus_exporter import PrometheusExporter
+from aop.composite_aspect import CompositeAspect
+from aop.health_info_aspect import HealthInfoAspect
+from aop.logging_aspect import LoggingAspect
+from aop.metrics_aspect import MetricsAspect
+from aop.validation_aspect import ValidationAspect
+
+
+class DummyService:
+    def __init__(self):
+        self.name = "composite"
+        self.port = 5999
+        self.metrics = PrometheusExporter(service_name=self.name)
+
+    def double(self, x: int) -> int:
+        return x * 2
+
+    def fail(self):
+        raise RuntimeError("boom")
+
+
+def test_composite_aspect_runs_all_advice_in_one_wrapper():
+    svc = DummyService()
+    lines = []
+    health = HealthInfoAspect(svc)
+    aspect = CompositeAspect([LoggingAspect(logger=lines.append), MetricsAspect(), health, ValidationAspect()])
+    aspect.apply_to_public_methods(svc, include=["double", "fail"])
+
+    assert svc.double(2) == 4
+    with pytest.raises(RuntimeError):
+        svc.fail()
+    with pytest.raises(TypeError):
+        svc.double("2")
+
+    # a single fused frame over the validation wrapper, over the original method
+    assert svc.double.__wrapped__.__wrapped__.__func__ is DummyService.double
+
+    assert any(line.startswith("before double") for line in lines)
+    assert any(line.startswith("after double result=4") for line in lines)
+    assert any(line.startswith("exception in fail: boom") for line in lines)
+
+    assert health.call_count == 3
+    assert health.error_count == 2
+    assert "expected int" in health.last_error
+
+    data, _ = svc.metrics.export_metrics()
+    assert b'composite_requests_total{method="double",service="composite"} 2.0' in data
+    assert b'composite_requests_failed_total{method="fail",service="composite"} 1.0' in data
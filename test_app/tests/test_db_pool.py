@@ -0,0 +1,105 @@
+import gc
+import weakref
+
+import pytest
+
+import common.db as db
+
+
+class FakeConn:
+    opened = 0
+
+    def __init__(self):
+        FakeConn.opened += 1
+        self._in_transaction = True
+        self.broken = False
+        self.closed = False
+
+    def rollback(self):
+        if self.broken:
+            raise OSError("connection lost")
+        self._in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+    def prepare(self, sql):
+        # like pg8000's PreparedStatement, the statement holds its connection
+        return FakeStatement(self, sql)
+
+
+class FakeStatement:
+    def __init__(self, conn, sql):
+        self.con = conn
+        self.sql = sql
+
+
+@pytest.fixture
+def fake_pg(monkeypatch):
+    FakeConn.opened = 0
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/shop")
+    monkeypatch.setattr(db, "_pools", {})
+    monkeypatch.setattr(db, "_statements", weakref.WeakKeyDictionary())
+    monkeypatch.setattr(db, "psycopg", None)
+    monkeypatch.setattr(db.pg8000, "connect", lambda **kwargs: FakeConn())
+
+
+def test_get_conn_reuses_pooled_connection(fake_pg):
+    with db.get_conn() as first:
+        pass
+    with db.get_conn() as second:
+        pass
+
+    assert second is first
+    assert FakeConn.opened == 1
+    assert not first._in_transaction
+
+
+def test_get_conn_discards_broken_connection(fake_pg):
+    with pytest.raises(OSError):
+        with db.get_conn() as conn:
+            conn.broken = True
+            raise OSError("connection lost")
+
+    assert conn.closed
+    with db.get_conn() as fresh:
+        pass
+    assert fresh is not conn
+    assert FakeConn.opened == 2
+
+
+def test_prepared_statement_is_created_once_per_connection(fake_pg):
+    sql = "SELECT id FROM products WHERE id=:item_id;"
+    with db.get_conn() as conn:
+        stmt = db.prepared(conn, sql)
+    with db.get_conn() as same_conn:
+        assert db.prepared(same_conn, sql) is stmt
+
+    assert db.prepared(FakeConn(), sql) is not stmt
+
+
+def test_close_pools_closes_idle_connections(fake_pg):
+    with db.get_conn() as conn:
+        pass
+
+    db.close_pools()
+
+    assert conn.closed
+    with db.get_conn() as fresh:
+        pass
+    assert fresh is not conn
+
+
+def test_discarded_connection_is_freed_with_its_statements(fake_pg):
+    with pytest.raises(OSError):
+        with db.get_conn() as conn:
+            db.prepared(conn, "SELECT 1;")
+            conn.broken = True
+            raise OSError("connection lost")
+
+    assert conn.closed
+    ref = weakref.ref(conn)
+    del conn
+    gc.collect()
+    assert ref() is None
+    assert len(db._statements) == 0
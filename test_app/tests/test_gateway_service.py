@@ -1,25 +1,15 @@
 from microservices.gateway.gateway_service import GatewayService
-from common.db import get_conn, db_available
+from common.db import db_available
+from _db_helpers import cleanup_user
 import pytest
 
 
 pytestmark = pytest.mark.skipif(not db_available(), reason="Postgres not available on this machine")
 
 
-def _cleanup_user(user_id: str):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM cart_items WHERE cart_id IN (SELECT id FROM carts WHERE user_id = %s AND status='open');",
-                (user_id,),
-            )
-            cur.execute("DELETE FROM carts WHERE user_id = %s AND status='open';", (user_id,))
-        conn.commit()
-
-
 def test_gateway_add_to_cart_and_checkout_pay():
     user = "greg"
-    _cleanup_user(user)
+    cleanup_user(user)
 
     gw = GatewayService("gateway", 5000)
 
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+from aop.health_info_aspect import HealthInfoAspect
+from common.json_provider import conditional_json, install
+
+
+def test_installed_provider_matches_flask_compact_output():
+    app = Flask(__name__)
+    install(app)
+
+    with app.app_context():
+        resp = jsonify({"b": Decimal("1.5"), "a": [1, 2]})
+
+    assert resp.mimetype == "application/json"
+    assert resp.data == b'{"a":[1,2],"b":"1.5"}\n'
+
+
+def test_conditional_json_answers_304_for_matching_etag():
+    app = Flask(__name__)
+    install(app)
+    app.add_url_rule("/health", "health", lambda: conditional_json({"status": "ok"}))
+    client = app.test_client()
+
+    first = client.get("/health")
+    assert first.status_code == 200
+    assert first.get_json() == {"status": "ok"}
+
+    again = client.get("/health", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_conditional_json_etag_ignores_uptime_and_timestamps():
+    class Svc:
+        name, port = "catalog", 5001
+
+        def ping(self):
+            return "pong"
+
+    svc = Svc()
+    health = HealthInfoAspect(svc)
+    health.apply_to_public_methods(svc)
+    app = Flask(__name__)
+    install(app)
+    app.add_url_rule("/health", "health", lambda: conditional_json(health.get_health()))
+    app.add_url_rule("/info", "info", lambda: conditional_json(health.get_info()))
+    client = app.test_client()
+
+    svc.ping()
+    first = {path: client.get(path) for path in ("/health", "/info")}
+    # a later poll: uptime has moved on by seconds, and fresh calls bumped calls/last_success_ts
+    health.start_time -= 5
+    health.last_success_ts -= 5
+    svc.ping()
+    for path, resp in first.items():
+        again = client.get(path, headers={"If-None-Match": resp.headers["ETag"]})
+        assert again.status_code == 304
+
+    # a real change (an error) still invalidates the /health ETag
+    health._on_exception(RuntimeError("db down"))
+    changed = client.get("/health", headers={"If-None-Match": first["/health"].headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.get_json()["status"] == "degraded"
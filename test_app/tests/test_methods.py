@@ -0,0 +1,42 @@
+from aop.methods import iter_public_methods
+
+
+class Base:
+    def inherited(self):
+        return "base"
+
+
+class Dummy(Base):
+    def ok(self):
+        return "ok"
+
+    @staticmethod
+    def static():
+        return "static"
+
+    @classmethod
+    def klass(cls):
+        return cls.__name__
+
+    @property
+    def prop(self):
+        raise AssertionError("properties must not be evaluated")
+
+    def _private(self):
+        return "private"
+
+
+def test_iter_public_methods_walks_instance_then_mro():
+    d = Dummy()
+    d.ok = lambda: "wrapped"
+    found = dict(iter_public_methods(d))
+
+    assert sorted(found) == ["inherited", "klass", "ok", "static"]
+    assert found["ok"]() == "wrapped"
+    assert found["klass"]() == "Dummy"
+    assert found["inherited"]() == "base"
+
+
+def test_iter_public_methods_include_and_exclude():
+    d = Dummy()
+    assert [name for name, _ in iter_public_methods(d, include=["ok", "static"], exclude=["static"])] == ["ok"]
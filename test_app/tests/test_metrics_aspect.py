@@ -30,3 +30,15 @@ def test_metrics_aspect_records_request_and_latency():
     assert b'method="instrumented_method"' in data
     assert b"cart_request_latency_seconds_bucket" in data
     assert b"cart_request_latency_seconds_count" in data
+
+
+def test_metrics_aspect_second_instance_still_instruments():
+    svc = DummyService()
+    MetricsAspect().apply_to_public_methods(svc, include=["instrumented_method"])
+    MetricsAspect().apply_to_public_methods(svc, include=["instrumented_method"])
+
+    svc.instrumented_method()
+
+    data, _ = svc.metrics.export_metrics()
+    # both stacked wrappers share the one registered family
+    assert b'cart_requests_total{method="instrumented_method",service="cart"} 2.0' in data
@@ -1,27 +1,16 @@
 from microservices.cart.cart_service import CartService
 from microservices.payment.payment_service import PaymentService
 from common.db import get_conn, db_available
+from _db_helpers import cleanup_user
 import pytest
 
 
 pytestmark = pytest.mark.skipif(not db_available(), reason="Postgres not available on this machine")
 
 
-def _cleanup_user(user_id: str):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            # delete open carts for user
-            cur.execute(
-                "DELETE FROM cart_items WHERE cart_id IN (SELECT id FROM carts WHERE user_id = %s AND status='open');",
-                (user_id,),
-            )
-            cur.execute("DELETE FROM carts WHERE user_id = %s AND status='open';", (user_id,))
-        conn.commit()
-
-
 def test_process_payment_marks_order_paid():
     user = "carol"
-    _cleanup_user(user)
+    cleanup_user(user)
 
     cart = CartService("cart", 5002)
     cart.add_to_cart(user, 1)
@@ -16,3 +16,27 @@ def test_exporter_creates_and_exports_metrics():
     assert b"cart_requests_total" in data
     assert b"cart_request_latency_seconds_bucket" in data
     assert b"cart_request_latency_seconds_count" in data
+
+
+def test_exporter_returns_existing_family_on_reregistration():
+    exp = PrometheusExporter(service_name="cart")
+
+    first = exp.create_counter("requests_total", "test requests", label_names=["service", "method"])
+    again = exp.create_counter("requests_total", "test requests", label_names=["service", "method"])
+    hist = exp.create_histogram("request_latency_seconds", "latency", label_names=["service", "method"])
+
+    assert again is first
+    assert exp.create_histogram("request_latency_seconds", "latency", label_names=["service", "method"]) is hist
+
+
+def test_exporter_reuses_payload_within_ttl(monkeypatch):
+    exp = PrometheusExporter(service_name="cart")
+    c = exp.create_counter("requests_total", "test requests", labels={"service": "cart"})
+
+    first, _ = exp.export_metrics()
+    c.inc()
+    assert exp.export_metrics()[0] is first
+
+    monkeypatch.setattr(exp, "CACHE_TTL_SEC", 0.0)
+    fresh, _ = exp.export_metrics()
+    assert b'cart_requests_total{service="cart"} 1.0' in fresh
@@ -1,3 +1,5 @@
+from typing import Optional, Union
+
 import pytest
 
 from aop.validation_aspect import ValidationAspect
@@ -34,3 +36,32 @@ def test_validation_rejects_invalid_types():
 
     with pytest.raises(TypeError):
         d.echo(123)
+
+
+class Unions:
+    def pick(self, x: Optional[int], y: Union[str, list[int]] = "") -> tuple:
+        return (x, y)
+
+
+def test_validation_checks_union_and_optional():
+    u = Unions()
+    aspect = ValidationAspect()
+    aspect.apply_to_public_methods(u, include=["pick"])
+
+    assert u.pick(None) == (None, "")
+    assert u.pick(1, y=[2]) == (1, [2])
+
+    with pytest.raises(TypeError):
+        u.pick("1")
+
+    with pytest.raises(TypeError):
+        u.pick(1, y=2)
+
+
+def test_validation_leaves_unannotated_methods_unwrapped():
+    d = Dummy()
+    aspect = ValidationAspect()
+    aspect.apply_to_public_methods(d, include=["untyped"])
+
+    assert not hasattr(d.untyped, "__wrapped__")
+    assert d.untyped(1, 2) == (1, 2)